@@ -0,0 +1,42 @@
+"""Change login_count to integer
+
+Revision ID: 3f9a1c7d2e64
+Revises: 8c0a304de9c9
+Create Date: 2026-10-18 10:12:31.482519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2e64'
+down_revision: Union[str, None] = '8c0a304de9c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 登录次数改为整数，以便在 SQL 中原子递增
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column(
+            'login_count',
+            existing_type=sa.String(length=10),
+            type_=sa.Integer(),
+            existing_nullable=False,
+            server_default='0',
+            postgresql_using='login_count::integer',
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column(
+            'login_count',
+            existing_type=sa.Integer(),
+            type_=sa.String(length=10),
+            existing_nullable=False,
+            server_default='0',
+        )
@@ -0,0 +1,39 @@
+"""Add composite indexes for list queries
+
+Revision ID: a51c3e9d7b20
+Revises: 3f9a1c7d2e64
+Create Date: 2026-10-18 14:36:08.215903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51c3e9d7b20'
+down_revision: Union[str, None] = '3f9a1c7d2e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (索引名, 表名, 列)
+INDEXES = (
+    ('ix_user_is_active_id', 'user', ['is_active', 'id']),
+    ('ix_user_roles_role_id_user_id', 'user_roles', ['role_id', 'user_id']),
+    ('ix_system_configs_data_type_is_active_id', 'system_configs', ['data_type', 'is_active', 'id']),
+    ('ix_system_configs_is_active_id', 'system_configs', ['is_active', 'id']),
+    ('ix_notification_clients_type_enabled_id', 'notification_clients', ['type', 'enabled', 'id']),
+    ('ix_notification_clients_enabled_id', 'notification_clients', ['enabled', 'id']),
+)
+
+
+def upgrade() -> None:
+    # 列表查询的筛选条件 + 按 ID 分页
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
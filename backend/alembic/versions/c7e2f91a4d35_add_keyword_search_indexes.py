@@ -0,0 +1,76 @@
+"""Add keyword search indexes
+
+Revision ID: c7e2f91a4d35
+Revises: a51c3e9d7b20
+Create Date: 2026-10-18 16:02:41.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f91a4d35'
+down_revision: Union[str, None] = 'a51c3e9d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (表名, 搜索字段)
+SEARCH_TABLES = (
+    ('user', ('username', 'email', 'full_name')),
+    ('role', ('name', 'description')),
+    ('system_configs', ('key', 'value', 'description')),
+    ('notification_clients', ('name', 'type')),
+)
+
+
+def _sqlite_upgrade(table: str, fields: tuple) -> None:
+    fts = f'{table}_fts'
+    columns = ', '.join(f'"{field}"' for field in fields)
+    new_values = ', '.join(f'new."{field}"' for field in fields)
+    old_values = ', '.join(f'old."{field}"' for field in fields)
+    delete_old = f'INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES (\'delete\', old.id, {old_values});'
+    insert_new = f'INSERT INTO "{fts}"(rowid, {columns}) VALUES (new.id, {new_values});'
+    op.execute(
+        f'CREATE VIRTUAL TABLE "{fts}" USING fts5('
+        f'{columns}, content=\'{table}\', content_rowid=\'id\', tokenize=\'trigram\')'
+    )
+    op.execute(f'CREATE TRIGGER "{fts}_ai" AFTER INSERT ON "{table}" BEGIN {insert_new} END')
+    op.execute(f'CREATE TRIGGER "{fts}_ad" AFTER DELETE ON "{table}" BEGIN {delete_old} END')
+    op.execute(
+        f'CREATE TRIGGER "{fts}_au" AFTER UPDATE OF {columns} ON "{table}" '
+        f'BEGIN {delete_old} {insert_new} END'
+    )
+    # 为已有数据建立索引
+    op.execute(f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')')
+
+
+def upgrade() -> None:
+    # SQLite: FTS5 trigram 全文索引 + 同步触发器；PostgreSQL: pg_trgm GIN 索引
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for table, fields in SEARCH_TABLES:
+            _sqlite_upgrade(table, fields)
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, fields in SEARCH_TABLES:
+            for field in fields:
+                op.execute(
+                    f'CREATE INDEX "ix_{table}_{field}_trgm" ON "{table}" USING gin ("{field}" gin_trgm_ops)'
+                )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for table, _ in reversed(SEARCH_TABLES):
+            fts = f'{table}_fts'
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS "{fts}_{suffix}"')
+            op.execute(f'DROP TABLE IF EXISTS "{fts}"')
+    elif dialect == 'postgresql':
+        for table, fields in reversed(SEARCH_TABLES):
+            for field in fields:
+                op.execute(f'DROP INDEX IF EXISTS "ix_{table}_{field}_trgm"')
@@ -0,0 +1,28 @@
+"""Add reverse index on role_permissions
+
+Revision ID: e5a1d7c39b42
+Revises: c7e2f91a4d35
+Create Date: 2026-10-18 19:24:51.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1d7c39b42'
+down_revision: Union[str, None] = 'c7e2f91a4d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 主键为 (role_id, permission_id)，“权限是否已分配给角色”的检查按 permission_id 查找
+    op.create_index(
+        'ix_role_permissions_permission_id_role_id', 'role_permissions', ['permission_id', 'role_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_role_permissions_permission_id_role_id', table_name='role_permissions')
@@ -1,9 +1,10 @@
 """
 认证相关 API
 """
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -14,12 +15,14 @@ from app.core.database import get_db
 from app.crud.user import user as crud_user
 from app.schemas.auth import LoginRequest, LoginResponse, Token
 from app.schemas.user import User
+from app.services.login_stats import login_stats
+from app.services.permission_cache import permission_cache
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=LoginResponse)
-def login_for_access_token(
+async def login_for_access_token(
     request: Request,
     db: Session = Depends(get_db),
     form_data: LoginRequest = None
@@ -27,7 +30,7 @@ def login_for_access_token(
     """
     用户登录获取访问令牌
     """
-    user = crud_user.authenticate(
+    user = await crud_user.authenticate_async(
         db, username=form_data.username, password=form_data.password
     )
     if not user:
@@ -52,12 +55,16 @@ def login_for_access_token(
         elif request.headers.get('X-Real-IP'):
             client_ip = request.headers.get('X-Real-IP')
 
-    # 更新登录信息
-    crud_user.update_login_info(db, user=user, ip_address=client_ip)
+    # 记录登录信息，由后台任务批量写回
+    login_at = datetime.utcnow()
+    login_stats.record(user.id, ip_address=client_ip, login_at=login_at)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = None
+    if settings.ACCESS_TOKEN_EMBED_CLAIMS:
+        claims = await run_in_threadpool(permission_cache.token_claims, db, user.id)
     access_token = security.create_access_token(
-        user.id, expires_delta=access_token_expires
+        user.id, expires_delta=access_token_expires, claims=claims
     )
 
     return LoginResponse(
@@ -70,8 +77,8 @@ def login_for_access_token(
             "full_name": user.full_name,
             "preferred_language": user.preferred_language,
             "timezone": user.timezone,
-            "last_login_at": user.last_login_at,
-            "login_count": user.login_count
+            "last_login_at": login_at,
+            "login_count": user.login_count + login_stats.pending_count(user.id)
         }
     )
 
@@ -1,38 +1,82 @@
 """
 API 依赖项
 """
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import verify_token
+from app.core.database import (
+    AsyncSessionLocal,
+    async_read_session_factory,
+    current_user_id,
+    get_db,
+    read_session_factory,
+)
+from app.core.security import decode_token
 from app.crud.user import user as crud_user
 from app.models.user import User
+from app.schemas.auth import TokenPayload
+from app.services.permission_cache import Principal, permission_cache
+from app.utils.pagination import PageParams
 
 # HTTP Bearer 认证
 security = HTTPBearer()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+) -> Dict[str, Any]:
     """
-    获取当前用户
+    解析并验证访问令牌
     """
-    token = credentials.credentials
-    user_id = verify_token(token)
-    
-    if user_id is None:
+    payload = decode_token(credentials.credentials)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = crud_user.get(db, id=user_id)
+    # 记录当前用户，写事务提交后据此开启读己之写窗口
+    current_user_id.set(int(payload["sub"]))
+    return payload
+
+
+def get_read_db(
+    payload: Dict[str, Any] = Depends(get_token_payload)
+) -> Generator:
+    """
+    获取只读数据库会话
+
+    读请求使用只读副本，当前用户刚写入过数据时使用主库。
+    依赖令牌解析以保证在确定当前用户之后再选择数据库
+    """
+    db = read_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    payload: Dict[str, Any] = Depends(get_token_payload)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取异步只读数据库会话
+    """
+    async with async_read_session_factory()() as db:
+        yield db
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    payload: Dict[str, Any] = Depends(get_token_payload)
+) -> User:
+    """
+    获取当前用户
+    """
+    user = crud_user.get(db, id=payload["sub"])
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,25 +100,100 @@ def get_current_active_user(
     return current_user
 
 
+async def load_principal(db: AsyncSession, payload: Dict[str, Any]) -> Principal:
+    """
+    按令牌中的用户ID获取认证主体（缓存命中时不查询数据库，也不加载 ORM 用户对象）
+
+    在事件循环中执行，不占用线程池
+    """
+    principal = await db.run_sync(permission_cache.get_principal, int(payload["sub"]))
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return principal
+
+
+async def get_current_principal(
+    payload: Dict[str, Any] = Depends(get_token_payload)
+) -> Principal:
+    """
+    获取当前认证主体
+
+    认证查询使用单独的短会话，查询后立即归还连接。请求会话在响应结束后才关闭，
+    缓存未命中的并发请求如果各自持有一个连接再申请第二个，连接池耗尽时会互相等待
+    """
+    async with AsyncSessionLocal() as db:
+        return await load_principal(db, payload)
 
 
+async def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    获取当前激活的认证主体
+    """
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return principal
+
+
+def principal_from_claims(payload: Dict[str, Any]) -> Optional[Principal]:
+    """
+    根据令牌中的鉴权声明获取认证主体（ACCESS_TOKEN_EMBED_CLAIMS）
+
+    声明的版本号与服务端当前版本一致时不加载用户，权限由位图索引计算；
+    令牌不含声明或声明已过期时返回 None
+    """
+    token = TokenPayload(**payload)
+    if token.pv is None or token.rls is None:
+        return None
+    return permission_cache.principal_from_claims(
+        int(token.sub), token.name or "", bool(token.act), token.rls, token.pv
+    )
+
+
+def page_params(default_limit: int = 20, max_limit: int = 100, with_total: bool = True):
+    """
+    列表分页参数依赖工厂
+
+    Args:
+        default_limit: 默认每页数量
+        max_limit: 每页数量上限
+        with_total: 默认是否统计总数
+    """
+    def get_page_params(
+        skip: int = Query(0, ge=0, description="偏移量（提供 cursor 时忽略）"),
+        limit: int = Query(default_limit, ge=1, le=max_limit),
+        cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+        total: bool = Query(with_total, alias="with_total", description="是否统计总数"),
+    ) -> PageParams:
+        return PageParams(skip=skip, limit=limit, cursor=cursor, with_total=total)
+
+    return get_page_params
+
 
 def require_permission(permission_code: str):
     """
     权限检查装饰器工厂
     """
-    def permission_checker(
-        current_user: User = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
-    ) -> User:
-        # 严格按照数据库中的权限分配检查，不给超级用户特殊待遇
-        # 检查用户是否有指定权限
-        user_permissions = []
-        for role in current_user.roles:
-            for permission in role.permissions:
-                user_permissions.append(permission.code)
-
-        if permission_code not in user_permissions:
+    async def permission_checker(
+        payload: Dict[str, Any] = Depends(get_token_payload)
+    ) -> Principal:
+        # 与 get_current_principal 相同，鉴权查询使用单独的短会话
+        async with AsyncSessionLocal() as db:
+            current_user = principal_from_claims(payload)
+            if current_user is None:
+                current_user = await load_principal(db, payload)
+            current_user = await get_current_active_principal(current_user)
+
+            # 严格按照数据库中的权限分配检查，不给超级用户特殊待遇
+            allowed = await db.run_sync(permission_cache.has_permission, current_user, permission_code)
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied. Required permission: {permission_code}"
@@ -0,0 +1,75 @@
+"""
+运行时监控 API
+"""
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.database import get_engines, get_pool_stats
+from app.core.lazy_load import lazy_load_detector
+from app.core.security import password_hasher, token_cache
+from app.services.permission_cache import Principal
+from app.services.sql_profiler import sql_profiler
+
+router = APIRouter()
+
+
+@router.get("/password-hasher")
+def get_password_hasher_stats(
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
+) -> Any:
+    """
+    获取密码哈希执行器统计信息（排队数、排队等待和哈希耗时）
+    """
+    return password_hasher.stats()
+
+
+@router.get("/token-cache")
+def get_token_cache_stats(
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
+) -> Any:
+    """
+    获取令牌缓存统计信息（命中、未命中和条目数）
+    """
+    return token_cache.stats()
+
+
+@router.get("/db-pool")
+def get_db_pool_stats(
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
+) -> Any:
+    """
+    获取数据库连接池统计信息（已借出、溢出连接数和等待时间）
+    """
+    return {name: get_pool_stats(engine) for name, engine in get_engines().items()}
+
+
+@router.get("/sql")
+def get_sql_stats(
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
+) -> Any:
+    """
+    获取各路由的 SQL 统计信息（语句数和数据库耗时的 p50/p95）
+    """
+    return sql_profiler.stats()
+
+
+@router.delete("/sql")
+def reset_sql_stats(
+    current_user: Principal = Depends(deps.require_permission("system:config_update")),
+) -> Any:
+    """
+    清空路由 SQL 统计信息
+    """
+    sql_profiler.reset()
+    return {"message": "SQL stats reset successfully"}
+
+
+@router.get("/lazy-loads")
+def get_lazy_loads(
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
+) -> Any:
+    """
+    获取检测到的关系延迟加载（路由、属性和次数），需开启 LAZY_LOAD_MODE
+    """
+    return {"mode": lazy_load_detector.mode, "lazy_loads": lazy_load_detector.report()}
@@ -2,13 +2,12 @@
 通知客户端管理 API
 """
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.notification_client import notification_client as crud_notification_client
-from app.models.user import User
 from app.schemas.notification_client import (
     NotificationClient,
     NotificationClientCreate,
@@ -28,6 +27,8 @@ from app.utils.notification_configs import (
     get_notification_scenarios
 )
 from app.services.notification_service import notification_service
+from app.services.permission_cache import Principal
+from app.utils.pagination import PageParams
 # from app.utils.pagination import paginate  # 暂时注释掉，不需要
 
 router = APIRouter()
@@ -35,7 +36,7 @@ router = APIRouter()
 
 @router.get("/types", response_model=List[NotificationTypeConfig])
 def get_notification_types_api(
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     获取所有支持的通知类型配置
@@ -46,7 +47,7 @@ def get_notification_types_api(
 @router.get("/types/{type_key}", response_model=NotificationTypeConfig)
 def get_notification_type_config_api(
     type_key: str,
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     获取指定通知类型的配置
@@ -62,7 +63,7 @@ def get_notification_type_config_api(
 
 @router.get("/scenarios", response_model=List[NotificationScenario])
 def get_notification_scenarios_api(
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     获取所有推送场景配置
@@ -75,7 +76,7 @@ def validate_notification_config_api(
     *,
     type_key: str,
     config_data: dict,
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     验证通知配置
@@ -91,7 +92,7 @@ def validate_notification_config_api(
 async def test_notification(
     *,
     test_request: NotificationTestRequest,
-    current_user: User = Depends(deps.require_permission("notification:test")),
+    current_user: Principal = Depends(deps.require_permission("notification:test")),
 ) -> Any:
     """
     测试通知发送
@@ -122,32 +123,38 @@ async def test_notification(
 
 @router.get("/", response_model=List[NotificationClient])
 def read_notification_clients(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
+    page: PageParams = Depends(deps.page_params(default_limit=100, max_limit=1000, with_total=False)),
     keyword: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
     enabled: Optional[bool] = Query(None),
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     获取通知客户端列表
+
+    响应体保持为列表，下一页游标和总数通过 X-Next-Cursor、X-Total-Count、X-Total-Exact 响应头返回
     """
-    clients = crud_notification_client.search(
+    result = crud_notification_client.search_page(
         db,
+        page=page,
         keyword=keyword,
         type=type,
-        enabled=enabled,
-        skip=skip,
-        limit=limit
+        enabled=enabled
     )
-    return clients
+    if result.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = result.next_cursor
+    if result.total is not None:
+        response.headers["X-Total-Count"] = str(result.total)
+        response.headers["X-Total-Exact"] = "true" if result.total_exact else "false"
+    return result.items
 
 
 @router.get("/statistics")
 def get_notification_statistics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     获取通知客户端统计信息
@@ -160,7 +167,7 @@ def create_notification_client(
     *,
     db: Session = Depends(get_db),
     client_in: NotificationClientCreate,
-    current_user: User = Depends(deps.require_permission("notification:create")),
+    current_user: Principal = Depends(deps.require_permission("notification:create")),
 ) -> Any:
     """
     创建通知客户端
@@ -189,8 +196,8 @@ def create_notification_client(
 @router.get("/{client_id}", response_model=NotificationClient)
 def read_notification_client(
     client_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("notification:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("notification:read")),
 ) -> Any:
     """
     根据 ID 获取通知客户端
@@ -210,7 +217,7 @@ def update_notification_client(
     db: Session = Depends(get_db),
     client_id: int,
     client_in: NotificationClientUpdate,
-    current_user: User = Depends(deps.require_permission("notification:update")),
+    current_user: Principal = Depends(deps.require_permission("notification:update")),
 ) -> Any:
     """
     更新通知客户端
@@ -250,7 +257,7 @@ def delete_notification_client(
     *,
     db: Session = Depends(get_db),
     client_id: int,
-    current_user: User = Depends(deps.require_permission("notification:delete")),
+    current_user: Principal = Depends(deps.require_permission("notification:delete")),
 ) -> Any:
     """
     删除通知客户端
@@ -271,7 +278,7 @@ def toggle_notification_client(
     *,
     db: Session = Depends(get_db),
     client_id: int,
-    current_user: User = Depends(deps.require_permission("notification:update")),
+    current_user: Principal = Depends(deps.require_permission("notification:update")),
 ) -> Any:
     """
     切换通知客户端启用状态
@@ -292,7 +299,7 @@ async def send_notification(
     *,
     db: Session = Depends(get_db),
     send_request: NotificationSendRequest,
-    current_user: User = Depends(deps.require_permission("notification:send")),
+    current_user: Principal = Depends(deps.require_permission("notification:send")),
 ) -> Any:
     """
     发送通知
@@ -3,28 +3,29 @@
 """
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.permission import permission as crud_permission
-from app.models.user import User
 from app.schemas.permission import Permission as PermissionSchema, PermissionCreate, PermissionUpdate
+from app.services.permission_cache import Principal
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[PermissionSchema])
-def read_permissions(
-    db: Session = Depends(get_db),
+async def read_permissions(
+    db: AsyncSession = Depends(deps.get_async_read_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.require_permission("permission:read")),
+    current_user: Principal = Depends(deps.require_permission("permission:read")),
 ) -> Any:
     """
     获取权限列表
     """
-    permissions = crud_permission.get_multi(db, skip=skip, limit=limit)
+    permissions = await crud_permission.get_multi_async(db, skip=skip, limit=limit)
     return permissions
 
 
@@ -33,7 +34,7 @@ def create_permission(
     *,
     db: Session = Depends(get_db),
     permission_in: PermissionCreate,
-    current_user: User = Depends(deps.require_permission("permission:create")),
+    current_user: Principal = Depends(deps.require_permission("permission:create")),
 ) -> Any:
     """
     创建新权限
@@ -51,8 +52,8 @@ def create_permission(
 @router.get("/{permission_id}", response_model=PermissionSchema)
 def read_permission(
     permission_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("permission:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("permission:read")),
 ) -> Any:
     """
     根据 ID 获取权限
@@ -72,7 +73,7 @@ def update_permission(
     db: Session = Depends(get_db),
     permission_id: int,
     permission_in: PermissionUpdate,
-    current_user: User = Depends(deps.require_permission("permission:update")),
+    current_user: Principal = Depends(deps.require_permission("permission:update")),
 ) -> Any:
     """
     更新权限
@@ -92,24 +93,23 @@ def delete_permission(
     *,
     db: Session = Depends(get_db),
     permission_id: int,
-    current_user: User = Depends(deps.require_permission("permission:delete")),
+    current_user: Principal = Depends(deps.require_permission("permission:delete")),
 ) -> Any:
     """
     删除权限
     """
-    permission = crud_permission.get(db, id=permission_id)
-    if not permission:
+    if not crud_permission.exists(db, permission_id):
         raise HTTPException(
             status_code=404,
             detail="The permission with this id does not exist in the system",
         )
     
-    # 检查是否有角色使用此权限
-    if permission.roles:
+    # 检查是否有角色使用此权限（EXISTS，不加载角色）
+    if crud_permission.has_roles(db, permission_id=permission_id):
         raise HTTPException(
             status_code=400,
             detail="Cannot delete permission that is assigned to roles",
         )
     
-    permission = crud_permission.remove(db, id=permission_id)
+    crud_permission.remove(db, id=permission_id)
     return {"message": "Permission deleted successfully"}
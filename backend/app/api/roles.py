@@ -3,39 +3,40 @@
 """
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.role import role as crud_role
 from app.crud.permission import permission as crud_permission
-from app.models.user import User
-from app.schemas.role import Role as RoleSchema, RoleCreate, RoleUpdate, RoleWithPermissions
+from app.schemas.bulk import BulkDelete, BulkItems, BulkResult
+from app.schemas.role import Role as RoleSchema, RoleCreate, RoleUpdate, RoleBulkUpdate, RoleWithPermissions
+from app.services.permission_cache import Principal
+from app.utils.pagination import PageParams
 
 router = APIRouter()
 
 
 @router.get("/")
-def read_roles(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+async def read_roles(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    page: PageParams = Depends(deps.page_params()),
     keyword: Optional[str] = Query(None, description="搜索关键词（角色名称、描述）"),
-    current_user: User = Depends(deps.require_permission("role:read")),
+    current_user: Principal = Depends(deps.require_permission("role:read")),
 ) -> Any:
     """
     获取角色列表（支持搜索）
     """
-    roles, total = crud_role.get_multi_with_search(
+    result = await crud_role.get_multi_with_search_async(
         db,
-        skip=skip,
-        limit=limit,
+        page=page,
         keyword=keyword
     )
 
     # 转换为字典格式以便序列化
     roles_data = []
-    for role in roles:
+    for role in result.items:
         role_dict = {
             "id": role.id,
             "name": role.name,
@@ -49,9 +50,11 @@ def read_roles(
 
     return {
         "data": roles_data,
-        "total": total,
-        "skip": skip,
-        "limit": limit
+        "total": result.total,
+        "total_exact": result.total_exact,
+        "skip": page.skip,
+        "limit": page.limit,
+        "next_cursor": result.next_cursor
     }
 
 
@@ -60,7 +63,7 @@ def create_role(
     *,
     db: Session = Depends(get_db),
     role_in: RoleCreate,
-    current_user: User = Depends(deps.require_permission("role:create")),
+    current_user: Principal = Depends(deps.require_permission("role:create")),
 ) -> Any:
     """
     创建新角色
@@ -75,10 +78,49 @@ def create_role(
     return role
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_roles_bulk(
+    *,
+    db: Session = Depends(get_db),
+    roles_in: BulkItems[RoleCreate],
+    current_user: Principal = Depends(deps.require_permission("role:create")),
+) -> Any:
+    """
+    批量创建角色（一个事务内完成，逐条返回结果）
+    """
+    return crud_role.create_many(db, objs_in=roles_in.items)
+
+
+@router.put("/bulk", response_model=BulkResult)
+def update_roles_bulk(
+    *,
+    db: Session = Depends(get_db),
+    roles_in: BulkItems[RoleBulkUpdate],
+    current_user: Principal = Depends(deps.require_permission("role:update")),
+) -> Any:
+    """
+    批量更新角色
+    """
+    return crud_role.update_many(db, objs_in=roles_in.items)
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+def delete_roles_bulk(
+    *,
+    db: Session = Depends(get_db),
+    roles_in: BulkDelete,
+    current_user: Principal = Depends(deps.require_permission("role:delete")),
+) -> Any:
+    """
+    批量删除角色（已分配给用户的角色不会被删除）
+    """
+    return crud_role.remove_many(db, ids=roles_in.ids)
+
+
 @router.get("/statistics")
 def get_role_statistics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("role:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("role:read")),
 ) -> Any:
     """
     获取角色统计信息
@@ -90,8 +132,8 @@ def get_role_statistics(
 @router.get("/{role_id}", response_model=RoleWithPermissions)
 def read_role(
     role_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("role:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("role:read")),
 ) -> Any:
     """
     根据 ID 获取角色
@@ -111,7 +153,7 @@ def update_role(
     db: Session = Depends(get_db),
     role_id: int,
     role_in: RoleUpdate,
-    current_user: User = Depends(deps.require_permission("role:update")),
+    current_user: Principal = Depends(deps.require_permission("role:update")),
 ) -> Any:
     """
     更新角色
@@ -131,35 +173,34 @@ def delete_role(
     *,
     db: Session = Depends(get_db),
     role_id: int,
-    current_user: User = Depends(deps.require_permission("role:delete")),
+    current_user: Principal = Depends(deps.require_permission("role:delete")),
 ) -> Any:
     """
     删除角色
     """
-    role = crud_role.get(db, id=role_id)
-    if not role:
+    if not crud_role.exists(db, role_id):
         raise HTTPException(
             status_code=404,
             detail="The role with this id does not exist in the system",
         )
     
-    # 检查是否有用户使用此角色
-    if role.users:
+    # 检查是否有用户使用此角色（EXISTS，不加载用户）
+    if crud_role.has_users(db, role_id=role_id):
         raise HTTPException(
             status_code=400,
             detail="Cannot delete role that is assigned to users",
         )
     
-    role = crud_role.remove(db, id=role_id)
+    crud_role.remove(db, id=role_id)
     return {"message": "Role deleted successfully"}
 
 
 @router.get("/{role_id}/permissions")
 def get_role_permissions(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(deps.get_read_db),
     role_id: int,
-    current_user: User = Depends(deps.require_permission("role:read")),
+    current_user: Principal = Depends(deps.require_permission("role:read")),
 ) -> Any:
     """
     获取角色的权限列表
@@ -190,28 +231,26 @@ def assign_permission_to_role(
     db: Session = Depends(get_db),
     role_id: int,
     permission_id: int,
-    current_user: User = Depends(deps.require_permission("role:assign_permission")),
+    current_user: Principal = Depends(deps.require_permission("role:assign_permission")),
 ) -> Any:
     """
     为角色分配权限
     """
-    role = crud_role.get(db, id=role_id)
-    if not role:
+    if not crud_role.exists(db, role_id):
         raise HTTPException(
             status_code=404,
             detail="Role not found",
         )
 
-    permission = crud_permission.get(db, id=permission_id)
-    if not permission:
+    if not crud_permission.exists(db, permission_id):
         raise HTTPException(
             status_code=404,
             detail="Permission not found",
         )
 
-    if permission not in role.permissions:
-        role.permissions.append(permission)
-        db.commit()
+    # 成员关系用 EXISTS 判断，不加载角色的权限集合
+    if not crud_role.has_permission(db, role_id=role_id, permission_id=permission_id):
+        crud_role.add_permission(db, role_id=role_id, permission_id=permission_id)
 
     return {"message": "Permission assigned to role successfully"}
 
@@ -222,28 +261,25 @@ def remove_permission_from_role(
     db: Session = Depends(get_db),
     role_id: int,
     permission_id: int,
-    current_user: User = Depends(deps.require_permission("role:assign_permission")),
+    current_user: Principal = Depends(deps.require_permission("role:assign_permission")),
 ) -> Any:
     """
     从角色中移除权限
     """
-    role = crud_role.get(db, id=role_id)
-    if not role:
+    if not crud_role.exists(db, role_id):
         raise HTTPException(
             status_code=404,
             detail="Role not found",
         )
     
-    permission = crud_permission.get(db, id=permission_id)
-    if not permission:
+    if not crud_permission.exists(db, permission_id):
         raise HTTPException(
             status_code=404,
             detail="Permission not found",
         )
     
-    if permission in role.permissions:
-        role.permissions.remove(permission)
-        db.commit()
+    if crud_role.has_permission(db, role_id=role_id, permission_id=permission_id):
+        crud_role.remove_permission(db, role_id=role_id, permission_id=permission_id)
     
     return {"message": "Permission removed from role successfully"}
 
@@ -259,30 +295,22 @@ def update_role_permissions(
     db: Session = Depends(get_db),
     role_id: int,
     assignment: PermissionAssignment,
-    current_user: User = Depends(deps.require_permission("role:assign_permission")),
+    current_user: Principal = Depends(deps.require_permission("role:assign_permission")),
 ) -> Any:
     """
-    更新角色的权限列表
+    更新角色的权限列表（只写入变化的部分）
     """
-    role = crud_role.get(db, id=role_id)
-    if not role:
+    if not crud_role.exists(db, role_id):
         raise HTTPException(
             status_code=404,
             detail="Role not found",
         )
     
-    # 获取所有指定的权限
-    permissions = []
-    for permission_id in assignment.permission_ids:
-        permission = crud_permission.get(db, id=permission_id)
-        if permission:
-            permissions.append(permission)
-    
-    # 更新角色的权限列表
-    role.permissions = permissions
-    db.commit()
+    added, removed = crud_role.set_role_permissions(
+        db, role_id=role_id, permission_ids=assignment.permission_ids
+    )
     
-    return {"message": "Role permissions updated successfully"}
+    return {"message": "Role permissions updated successfully", "added": added, "removed": removed}
 
 
 
@@ -1,32 +1,33 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
 from app.api import deps
 from app.models.user import User
 from app.services.config_manager import config_manager
+from app.services.permission_cache import Principal
+from app.utils.pagination import PageParams
 
 router = APIRouter()
 
 
 @router.get("/")
-def read_system_configs(
-    db: Session = Depends(deps.get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+async def read_system_configs(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    page: PageParams = Depends(deps.page_params()),
     keyword: Optional[str] = Query(None, description="搜索关键词（配置键、配置值）"),
     data_type: Optional[str] = Query(None, description="数据类型筛选"),
     is_active: Optional[bool] = Query(None, description="状态筛选"),
-    current_user: User = Depends(deps.require_permission("system:config_read")),
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
 ) -> Any:
     """
     获取系统配置列表（支持搜索和筛选）
     """
-    configs, total = crud.crud_system_config.get_multi_with_search(
+    result = await crud.crud_system_config.get_multi_with_search_async(
         db,
-        skip=skip,
-        limit=limit,
+        page=page,
         keyword=keyword,
         data_type=data_type,
         is_active=is_active
@@ -34,7 +35,7 @@ def read_system_configs(
 
     # 转换为字典格式以便序列化
     configs_data = []
-    for config in configs:
+    for config in result.items:
         config_dict = {
             "id": config.id,
             "key": config.key,
@@ -50,9 +51,11 @@ def read_system_configs(
 
     return {
         "data": configs_data,
-        "total": total,
-        "skip": skip,
-        "limit": limit
+        "total": result.total,
+        "total_exact": result.total_exact,
+        "skip": page.skip,
+        "limit": page.limit,
+        "next_cursor": result.next_cursor
     }
 
 
@@ -61,7 +64,7 @@ def create_system_config(
     *,
     db: Session = Depends(deps.get_db),
     config_in: schemas.SystemConfigCreate,
-    current_user: User = Depends(deps.require_permission("system:config_create")),
+    current_user: Principal = Depends(deps.require_permission("system:config_create")),
 ) -> Any:
     """
     创建系统配置
@@ -84,7 +87,7 @@ def update_system_config(
     db: Session = Depends(deps.get_db),
     config_id: int,
     config_in: schemas.SystemConfigUpdate,
-    current_user: User = Depends(deps.require_permission("system:config_update")),
+    current_user: Principal = Depends(deps.require_permission("system:config_update")),
 ) -> Any:
     """
     更新系统配置
@@ -102,8 +105,8 @@ def update_system_config(
 
 @router.get("/statistics")
 def get_system_config_statistics(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.require_permission("system:config_read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
 ) -> Any:
     """
     获取系统配置统计信息
@@ -115,9 +118,9 @@ def get_system_config_statistics(
 @router.get("/{config_id}", response_model=schemas.SystemConfig)
 def read_system_config(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     config_id: int,
-    current_user: User = Depends(deps.require_permission("system:config_read")),
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
 ) -> Any:
     """
     获取单个系统配置
@@ -136,7 +139,7 @@ def delete_system_config(
     *,
     db: Session = Depends(deps.get_db),
     config_id: int,
-    current_user: User = Depends(deps.require_permission("system:config_delete")),
+    current_user: Principal = Depends(deps.require_permission("system:config_delete")),
 ) -> Any:
     """
     删除系统配置
@@ -187,7 +190,7 @@ def read_active_configs(
 
 @router.get("/manager/status")
 def get_config_manager_status(
-    current_user: User = Depends(deps.require_permission("system:config_read")),
+    current_user: Principal = Depends(deps.require_permission("system:config_read")),
 ) -> Any:
     """
     获取配置管理器状态
@@ -204,7 +207,7 @@ def get_config_manager_status(
 
 @router.post("/manager/refresh")
 async def refresh_config_manager(
-    current_user: User = Depends(deps.require_permission("system:config_update")),
+    current_user: Principal = Depends(deps.require_permission("system:config_update")),
 ) -> Any:
     """
     手动刷新配置管理器
@@ -3,34 +3,44 @@
 """
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.database import get_db
 from app.crud.user import user as crud_user
 from app.models.user import User
-from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, UserWithRoles, UserPreferences, PasswordChange
+from app.schemas.bulk import BulkDelete, BulkItems, BulkResult
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, UserBulkUpdate, UserWithRoles, UserPreferences, PasswordChange
+from app.services.permission_cache import Principal
+from app.utils.pagination import PageParams
 
 router = APIRouter()
 
+# 违反唯一约束的列 -> 错误信息
+DUPLICATE_USER_MESSAGES = {
+    "email": "The user with this email already exists in the system.",
+    "username": "The user with this username already exists in the system.",
+}
+
 
 @router.get("/")
-def read_users(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+async def read_users(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    page: PageParams = Depends(deps.page_params()),
     keyword: Optional[str] = Query(None, description="搜索关键词（用户名、邮箱、姓名）"),
     role_id: Optional[int] = Query(None, description="角色ID筛选"),
     is_active: Optional[bool] = Query(None, description="状态筛选"),
-    current_user: User = Depends(deps.require_permission("user:read")),
+    current_user: Principal = Depends(deps.require_permission("user:read")),
 ) -> Any:
     """
     获取用户列表（支持搜索和筛选）
     """
-    users, total = crud_user.get_multi_with_search(
+    result = await crud_user.get_multi_with_search_async(
         db,
-        skip=skip,
-        limit=limit,
+        page=page,
         keyword=keyword,
         role_id=role_id,
         is_active=is_active
@@ -38,7 +48,7 @@ def read_users(
 
     # 转换为字典格式以便序列化
     users_data = []
-    for user in users:
+    for user in result.items:
         user_dict = {
             "id": user.id,
             "username": user.username,
@@ -53,38 +63,74 @@ def read_users(
 
     return {
         "data": users_data,
-        "total": total,
-        "skip": skip,
-        "limit": limit
+        "total": result.total,
+        "total_exact": result.total_exact,
+        "skip": page.skip,
+        "limit": page.limit,
+        "next_cursor": result.next_cursor
     }
 
 
 @router.post("/", response_model=UserWithRoles)
-def create_user(
+async def create_user(
     *,
     db: Session = Depends(get_db),
     user_in: UserCreate,
-    current_user: User = Depends(deps.require_permission("user:create")),
+    current_user: Principal = Depends(deps.require_permission("user:create")),
 ) -> Any:
     """
-    创建新用户
+    创建新用户（用户名、邮箱重复由唯一约束检出，密码哈希在密码哈希线程池中计算）
     """
-    user = crud_user.get_by_email(db, email=user_in.email)
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this email already exists in the system.",
-        )
-    user = crud_user.get_by_username(db, username=user_in.username)
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this username already exists in the system.",
-        )
-    user = crud_user.create(db, obj_in=user_in)
+    try:
+        user = await crud_user.create_async(db, obj_in=user_in)
+    except IntegrityError as e:
+        column = crud_user.unique_violation(e)
+        if column not in DUPLICATE_USER_MESSAGES:
+            raise
+        raise HTTPException(status_code=400, detail=DUPLICATE_USER_MESSAGES[column])
     return user
 
 
+@router.post("/bulk", response_model=BulkResult)
+def create_users_bulk(
+    *,
+    db: Session = Depends(get_db),
+    users_in: BulkItems[UserCreate],
+    current_user: Principal = Depends(deps.require_permission("user:create")),
+) -> Any:
+    """
+    批量创建用户（一个事务内完成，逐条返回结果）
+    """
+    return crud_user.create_many(db, objs_in=users_in.items)
+
+
+@router.put("/bulk", response_model=BulkResult)
+def update_users_bulk(
+    *,
+    db: Session = Depends(get_db),
+    users_in: BulkItems[UserBulkUpdate],
+    current_user: Principal = Depends(deps.require_permission("user:update")),
+) -> Any:
+    """
+    批量更新用户
+    """
+    return crud_user.update_many(db, objs_in=users_in.items)
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+def delete_users_bulk(
+    *,
+    db: Session = Depends(get_db),
+    users_in: BulkDelete,
+    current_user: Principal = Depends(deps.require_permission("user:delete")),
+) -> Any:
+    """
+    批量删除用户
+    """
+    # 防止删除自己
+    return crud_user.remove_many(db, ids=users_in.ids, rejected={current_user.id: "Cannot delete yourself"})
+
+
 @router.put("/me", response_model=UserWithRoles)
 def update_user_me(
     *,
@@ -114,8 +160,8 @@ def read_user_me(
 
 @router.get("/statistics")
 def get_user_statistics(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(deps.require_permission("user:read")),
+    db: Session = Depends(deps.get_read_db),
+    current_user: Principal = Depends(deps.require_permission("user:read")),
 ) -> Any:
     """
     获取用户统计信息
@@ -127,40 +173,39 @@ def get_user_statistics(
 @router.get("/{user_id}", response_model=UserSchema)
 def read_user_by_id(
     user_id: int,
-    current_user: User = Depends(deps.require_permission("user:read")),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(deps.require_permission("user:read")),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
     根据 ID 获取用户
     """
     user = crud_user.get(db, id=user_id)
-    if user == current_user:
-        return user
-    if not crud_user.is_superuser(current_user):
+    if not user:
         raise HTTPException(
-            status_code=400, detail="The user doesn't have enough privileges"
+            status_code=404,
+            detail="The user with this id does not exist in the system",
         )
     return user
 
 
 @router.put("/{user_id}", response_model=UserSchema)
-def update_user(
+async def update_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(deps.require_permission("user:update")),
+    current_user: Principal = Depends(deps.require_permission("user:update")),
 ) -> Any:
     """
-    更新用户
+    更新用户（新密码的哈希在密码哈希线程池中计算）
     """
-    user = crud_user.get(db, id=user_id)
+    user = await run_in_threadpool(crud_user.get, db, id=user_id)
     if not user:
         raise HTTPException(
             status_code=404,
             detail="The user with this id does not exist in the system",
         )
-    user = crud_user.update(db, db_obj=user, obj_in=user_in)
+    user = await crud_user.update_async(db, db_obj=user, obj_in=user_in)
     return user
 
 
@@ -169,7 +214,7 @@ def delete_user(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(deps.require_permission("user:delete")),
+    current_user: Principal = Depends(deps.require_permission("user:delete")),
 ) -> Any:
     """
     删除用户
@@ -239,7 +284,7 @@ def update_my_profile(
 
 
 @router.put("/me/password")
-def change_my_password(
+async def change_my_password(
     *,
     db: Session = Depends(get_db),
     password_change: PasswordChange,
@@ -248,18 +293,17 @@ def change_my_password(
     """
     修改当前用户的密码
     """
-    from app.core.security import verify_password, get_password_hash
+    from app.core.security import verify_password_async, get_password_hash_async
 
     # 验证当前密码
-    if not verify_password(password_change.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_change.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Current password is incorrect"
         )
 
     # 更新密码
-    current_user.hashed_password = get_password_hash(password_change.new_password)
-    db.commit()
+    current_user.hashed_password = await get_password_hash_async(password_change.new_password)
 
     return {"message": "Password changed successfully"}
 
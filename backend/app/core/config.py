@@ -19,9 +19,55 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     ALGORITHM: str = "HS256"
+    # 在访问令牌中嵌入激活状态、角色和鉴权版本，版本匹配时鉴权无需查询用户
+    ACCESS_TOKEN_EMBED_CLAIMS: bool = False
+    PASSWORD_HASH_WORKERS: int = 4  # 密码哈希专用线程数
+    TOKEN_CACHE_SIZE: int = 10000  # 已验证令牌缓存条目数，0 表示禁用
+    TOKEN_CACHE_TTL: int = 300  # 已验证令牌缓存有效期(秒)
+    
+    # 权限缓存配置
+    PERMISSION_CACHE_TTL: int = 300  # 用户权限缓存有效期(秒)
+    
+    # 登录统计写回配置
+    LOGIN_STATS_FLUSH_INTERVAL: float = 5  # 登录统计写回间隔(秒)
+    LOGIN_STATS_FLUSH_SIZE: int = 500  # 待写回用户数达到该值时立即写回
+    
+    # 批量操作配置
+    BULK_MAX_ITEMS: int = 1000  # 单个批量请求的最大条目数
+    BULK_CHUNK_SIZE: int = 500  # 批量写入时每条 SQL 处理的行数
+    
+    # 列表总数配置
+    COUNT_STRATEGY: str = "auto"  # exact 精确统计 / auto 小结果精确统计、大结果估算或缓存 / window 与分页查询合并为一次查询
+    EXACT_COUNT_THRESHOLD: int = 1000  # auto 模式下精确统计的行数上限
+    COUNT_CACHE_TTL: float = 60  # 大结果总数缓存有效期(秒)
+    COUNT_CACHE_SIZE: int = 1000  # 总数缓存条目数
     
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./fastapi_admin.db"
+    SCHEMA_CHECK_MODE: str = "check"  # 启动时数据库版本处理：check 不一致即失败 / migrate 加锁迁移 / off
+    ASYNC_DATABASE_URL: Optional[str] = None  # 异步接口使用的数据库地址，为空时由 DATABASE_URL 换用异步驱动得到
+    READ_DATABASE_URL: Optional[str] = None  # 只读副本地址，为空时读请求使用主库
+    ASYNC_READ_DATABASE_URL: Optional[str] = None  # 只读副本的异步地址，为空时由 READ_DATABASE_URL 推导
+    READ_AFTER_WRITE_WINDOW: float = 5  # 用户写入后读请求固定使用主库的时长(秒)
+    DB_ECHO: bool = False  # 输出 SQL 日志，与 DEBUG 分开控制
+    SQL_PROFILING_ENABLED: bool = True  # 统计每个请求的 SQL 语句数和数据库耗时
+    SLOW_QUERY_THRESHOLD_MS: float = 200  # 慢查询日志阈值(毫秒)，参数以类型代替
+    SQL_PROFILE_SAMPLES: int = 1000  # 每个路由保留的最近请求样本数
+    LAZY_LOAD_MODE: str = "off"  # 关系延迟加载检测：off / warn / raise，用于开发和测试环境
+    LAZY_LOAD_ALLOWLIST: List[str] = []  # 允许延迟加载的关系属性，如 ["User.roles"]
+    DB_POOL_CLASS: Optional[str] = None  # queue / null / static，为空时按方言选择
+    DB_POOL_SIZE: int = 5  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 10  # 连接池允许的溢出连接数
+    DB_POOL_TIMEOUT: float = 30  # 获取连接的最长等待时间(秒)
+    DB_POOL_RECYCLE: int = 1800  # 连接回收时间(秒)，SQLite 忽略
+    DB_POOL_PRE_PING: bool = True  # 取出连接前检测可用性，SQLite 忽略
+    
+    # SQLite 配置
+    SQLITE_PROFILE: str = "wal"  # default: SQLite 默认设置；wal: WAL 模式及调优参数
+    SQLITE_CACHE_SIZE_KB: int = 64000  # 每个连接的页缓存大小(KB)
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 内存映射大小(字节)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 数据库被锁定时的等待时间(毫秒)
+    SQLITE_SINGLE_WRITER: bool = False  # 写事务经由唯一写连接排队执行，读使用只读连接池
     
     # CORS配置
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = [
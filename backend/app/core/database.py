@@ -1,40 +1,605 @@
 """
 数据库配置和连接管理
 """
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import Engine, Result, ScalarResult, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from .config import settings
+from .lazy_load import lazy_load_detector  # noqa: F401  注册延迟加载检测
+
+logger = logging.getLogger(__name__)
+
+
+class _WaitStatsMixin:
+    """
+    记录获取连接等待时间
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started_at
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+class InstrumentedQueuePool(_WaitStatsMixin, QueuePool):
+    """
+    记录获取连接等待时间的连接池
+    """
+
+
+class InstrumentedAsyncQueuePool(_WaitStatsMixin, AsyncAdaptedQueuePool):
+    """
+    记录获取连接等待时间的异步引擎连接池
+    """
+
+
+# 同步驱动 -> 异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_driver_available(async_url: str) -> bool:
+    """异步驱动是否已安装"""
+    try:
+        make_url(async_url).get_dialect().import_dbapi()
+    except ImportError:
+        return False
+    return True
+
+
+def to_async_url(url: str) -> str:
+    """
+    将同步数据库 URL 转换为对应的异步驱动 URL
+    """
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def build_engine_options(url: str) -> Dict[str, Any]:
+    """
+    根据数据库方言和配置生成连接池参数
+
+    - SQLite 内存库使用 StaticPool（所有会话共享同一连接）
+    - SQLite 文件库使用不预检的 QueuePool，连接廉价且不会被服务端断开
+    - 其他数据库使用带预检和回收的 QueuePool
+    """
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    pool_class = settings.DB_POOL_CLASS
+
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if pool_class is None:
+            pool_class = "static" if _is_memory_sqlite(url) else "queue"
+    elif pool_class is None:
+        pool_class = "queue"
+
+    if pool_class == "static":
+        options["poolclass"] = StaticPool
+    elif pool_class == "null":
+        options["poolclass"] = NullPool
+    elif pool_class == "queue":
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE if backend != "sqlite" else -1,
+            pool_pre_ping=settings.DB_POOL_PRE_PING if backend != "sqlite" else False,
+        )
+    else:
+        raise ValueError(f"Unsupported DB_POOL_CLASS: {pool_class}")
+    return options
+
+
+def apply_sqlite_profile(engine: Engine, profile: str) -> None:
+    """
+    为 SQLite 引擎设置连接参数
+
+    - default: 保持 SQLite 默认设置（回滚日志模式）
+    - wal: WAL 日志模式，读写互不阻塞；synchronous=NORMAL，并设置页缓存、
+      内存映射、临时表存储和忙等待超时
+    """
+    if engine.dialect.name != "sqlite" or profile == "default":
+        return
+    if profile != "wal":
+        raise ValueError(f"Unsupported SQLITE_PROFILE: {profile}")
+
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def get_pool_stats(engine: Engine) -> Dict[str, Any]:
+    """
+    获取连接池运行状态
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, _WaitStatsMixin):
+        with pool._stats_lock:
+            stats.update(
+                wait_count=pool.wait_count,
+                wait_avg_ms=round(pool.wait_total / pool.wait_count * 1000, 3) if pool.wait_count else 0.0,
+                wait_max_ms=round(pool.wait_max * 1000, 3),
+                timeouts=pool.timeouts,
+            )
+    return stats
+
+
+# 会话已开始写事务的标记
+_WRITING_KEY = "single_writer_writing"
+
+
+class SingleWriterSession(Session):
+    """
+    SQLite 单写者会话
+
+    读操作使用只读连接池；一旦会话开始写（flush 或执行 INSERT/UPDATE/DELETE），
+    本事务剩余的操作都使用唯一的写连接。写连接池大小为 1，
+    并发的写事务在连接池队列中排队，而不是在 SQLite 写锁上竞争重试
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get(_WRITING_KEY)
+            or self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+        ):
+            self.info[_WRITING_KEY] = True
+            return engine
+        return sqlite_reader_engine
+
+
+@event.listens_for(SingleWriterSession, "after_commit")
+@event.listens_for(SingleWriterSession, "after_rollback")
+def _reset_single_writer(session: Session, *args) -> None:
+    """事务结束后释放写连接，后续读操作回到只读连接池"""
+    session.info.pop(_WRITING_KEY, None)
+
+
+def use_single_writer(url: str) -> bool:
+    """是否启用 SQLite 单写者模式（仅文件型 SQLite 数据库）"""
+    return (
+        settings.SQLITE_SINGLE_WRITER
+        and make_url(url).get_backend_name() == "sqlite"
+        and not _is_memory_sqlite(url)
+    )
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
 
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,
-)
+if use_single_writer(settings.DATABASE_URL):
+    engine_options = build_engine_options(settings.DATABASE_URL)
+    engine_options.update(pool_size=1, max_overflow=0, poolclass=InstrumentedQueuePool)
+    engine = create_engine(settings.DATABASE_URL, **engine_options)
+    sqlite_reader_engine: Optional[Engine] = create_engine(
+        settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL)
+    )
+    apply_sqlite_profile(sqlite_reader_engine, settings.SQLITE_PROFILE)
+    event.listen(sqlite_reader_engine, "connect", _set_query_only)
+else:
+    engine = create_engine(settings.DATABASE_URL, **build_engine_options(settings.DATABASE_URL))
+    sqlite_reader_engine = None
+apply_sqlite_profile(engine, settings.SQLITE_PROFILE)
 
 # 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 提交后对象不过期：写入时已通过 RETURNING 取回整行，提交后访问属性无需再次查询
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    class_=SingleWriterSession if sqlite_reader_engine is not None else Session,
+)
+
+
+
+def build_async_engine(url: str, async_url: Optional[str] = None) -> AsyncEngine:
+    """
+    创建与同步引擎配置一致的异步引擎
+
+    Args:
+        url: 同步数据库地址，用于确定连接池参数
+        async_url: 异步数据库地址，为空时由 url 换用异步驱动得到
+    """
+    options = build_engine_options(url)
+    if options.get("poolclass") is InstrumentedQueuePool:
+        options["poolclass"] = InstrumentedAsyncQueuePool
+    async_engine = create_async_engine(async_url or to_async_url(url), **options)
+    apply_sqlite_profile(async_engine.sync_engine, settings.SQLITE_PROFILE)
+    return async_engine
+
+
+class ThreadedAsyncSession:
+    """
+    在线程池中执行同步会话操作的异步会话
+
+    没有可用的异步驱动时代替 AsyncSession，提供异步接口用到的 execute、scalars、scalar、get 和 run_sync。
+    与 AsyncSession 一样，execute 和 scalars 返回已缓冲的结果
+    """
+
+    def __init__(self, sync_session: Session):
+        self.sync_session = sync_session
+
+    def _execute(self, statement: Any, params: Any = None, **kwargs: Any) -> Result:
+        return self.sync_session.execute(statement, params, **kwargs).freeze()()
+
+    async def execute(self, statement: Any, params: Any = None, **kwargs: Any) -> Result:
+        return await run_in_threadpool(self._execute, statement, params, **kwargs)
+
+    async def scalars(self, statement: Any, params: Any = None, **kwargs: Any) -> ScalarResult:
+        return (await self.execute(statement, params, **kwargs)).scalars()
+
+    async def scalar(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def __aenter__(self) -> "ThreadedAsyncSession":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+class AsyncDatabase:
+    """
+    按需创建的异步引擎和异步会话工厂
+
+    首次创建会话时才创建异步引擎，导入本模块（Alembic、命令行工具）不需要安装异步驱动。
+    数据库没有对应的异步驱动或驱动未安装时，会话退回到在线程池中执行同步会话（ThreadedAsyncSession）
+    """
+
+    def __init__(self, url: str, async_url: Optional[str], sync_factory: sessionmaker):
+        """
+        初始化异步数据库
+
+        Args:
+            url: 同步数据库地址
+            async_url: 异步数据库地址，为空时由 url 换用异步驱动得到
+            sync_factory: 退回同步会话时使用的会话工厂
+        """
+        self.url = url
+        self.async_url = async_url
+        self.sync_factory = sync_factory
+        self._engine: Optional[AsyncEngine] = None
+        self._factory: Optional[async_sessionmaker] = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> None:
+        with self._lock:
+            if self._resolved:
+                return
+            try:
+                async_url = self.async_url or to_async_url(self.url)
+            except ValueError as e:
+                async_url = None
+                reason = str(e)
+            else:
+                reason = f"async driver for {make_url(async_url).drivername} is not installed"
+            if async_url is not None and async_driver_available(async_url):
+                self._engine = build_async_engine(self.url, async_url)
+                self._factory = async_sessionmaker(
+                    self._engine,
+                    class_=AsyncSession,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+            else:
+                logger.warning("%s; async endpoints run the sync session in a thread pool", reason)
+            self._resolved = True
+
+    @property
+    def engine(self) -> Optional[AsyncEngine]:
+        """异步引擎，尚未创建或退回同步会话时为 None"""
+        return self._engine
+
+    def __call__(self) -> Union[AsyncSession, ThreadedAsyncSession]:
+        """创建异步会话"""
+        if not self._resolved:
+            self._resolve()
+        if self._factory is not None:
+            return self._factory()
+        return ThreadedAsyncSession(self.sync_factory())
+
+
+# 异步接口使用的会话工厂；同步引擎保留给 Alembic、后台任务和同步接口
+# 注意：SQLite 内存库无法在两个引擎之间共享
+AsyncSessionLocal = AsyncDatabase(settings.DATABASE_URL, settings.ASYNC_DATABASE_URL, SessionLocal)
+
+# 创建只读副本引擎，未配置时读请求使用主库
+if settings.READ_DATABASE_URL:
+    read_engine: Optional[Engine] = create_engine(
+        settings.READ_DATABASE_URL, **build_engine_options(settings.READ_DATABASE_URL)
+    )
+    apply_sqlite_profile(read_engine, settings.SQLITE_PROFILE)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    AsyncReadSessionLocal = AsyncDatabase(
+        settings.READ_DATABASE_URL, settings.ASYNC_READ_DATABASE_URL, ReadSessionLocal
+    )
+else:
+    read_engine = None
+    ReadSessionLocal = SessionLocal
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+
+class ReadYourWrites:
+    """
+    读己之写：用户提交写事务后的一段时间内，其读请求固定使用主库，避免读到副本延迟前的旧数据
+
+    仅记录在当前进程中，多进程部署时窗口应覆盖副本的正常延迟
+    """
+
+    def __init__(self, window: float = 5):
+        """
+        初始化读己之写记录
+
+        Args:
+            window: 写入后读请求固定到主库的时长(秒)
+        """
+        self.window = window
+        self._pinned_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int) -> None:
+        """记录用户刚提交了写事务"""
+        now = time.monotonic()
+        with self._lock:
+            self._pinned_until[user_id] = now + self.window
+            # 顺带清理过期记录，避免无限增长
+            if len(self._pinned_until) > 1024:
+                self._pinned_until = {
+                    uid: until for uid, until in self._pinned_until.items() if until > now
+                }
+
+    def is_pinned(self, user_id: Optional[int]) -> bool:
+        """用户的读请求是否需要使用主库"""
+        if user_id is None:
+            return False
+        until = self._pinned_until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+
+# 当前请求的用户ID，由认证依赖设置，用于记录读己之写
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+# 全局读己之写记录实例
+read_your_writes = ReadYourWrites(window=settings.READ_AFTER_WRITE_WINDOW)
+
+# 会话中存在待提交写入的标记
+_HAS_WRITES_KEY = "has_writes"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info[_HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_read_your_writes(session: Session) -> None:
+    if session.info.pop(_HAS_WRITES_KEY, False):
+        user_id = current_user_id.get()
+        if user_id is not None:
+            read_your_writes.mark(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session: Session) -> None:
+    session.info.pop(_HAS_WRITES_KEY, None)
+
+class QueryProfile:
+    """单个请求的 SQL 执行统计"""
+    __slots__ = ("statement_count", "db_time")
+
+    def __init__(self):
+        self.statement_count = 0
+        self.db_time = 0.0  # 秒
+
+
+# 当前请求的 SQL 执行统计，由请求中间件设置
+current_query_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_query_profile", default=None)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """将 SQL 参数替换为参数类型，避免日志中出现密码哈希、邮箱等敏感数据"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started_at
+    profile = current_query_profile.get()
+    if profile is not None:
+        profile.statement_count += 1
+        profile.db_time += elapsed
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s; parameters: %s",
+            elapsed * 1000, statement, redact_parameters(parameters)
+        )
+
+
+# 所有引擎（包括异步引擎底层的同步引擎）统一计时
+if settings.SQL_PROFILING_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
 
 # 创建基础模型类
 Base = declarative_base()
 
 
+def get_engines() -> Dict[str, Engine]:
+    """
+    获取当前使用的所有引擎（异步引擎在创建后才会列出）
+    """
+    engines = {"primary": engine}
+    if sqlite_reader_engine is not None:
+        engines["sqlite_reader"] = sqlite_reader_engine
+    if AsyncSessionLocal.engine is not None:
+        engines["async"] = AsyncSessionLocal.engine.sync_engine
+    if read_engine is not None:
+        engines["replica"] = read_engine
+        if AsyncReadSessionLocal.engine is not None:
+            engines["async_replica"] = AsyncReadSessionLocal.engine.sync_engine
+    return engines
+
+
 def get_db() -> Generator:
     """
-    获取数据库会话
+    获取数据库会话（请求级工作单元）
+
+    CRUD 方法只刷新不提交，请求处理成功后统一提交一次，处理过程中出现异常（包括 HTTPException）时回滚。
+    依赖的退出代码在响应序列化之后、发送之前执行，提交失败时客户端收到 500 而不是成功响应。
+    需要在请求结束前提交时可直接调用 db.commit()，需要自行管理事务时使用 get_manual_db
     """
+    db = SessionLocal()
     try:
-        db = SessionLocal()
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
-def create_tables():
+def get_manual_db() -> Generator:
+    """
+    获取自行管理事务的数据库会话：请求结束时不自动提交，未提交的写入在关闭会话时丢弃
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[Union[AsyncSession, ThreadedAsyncSession], None]:
+    """
+    获取异步数据库会话
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_session_factory() -> sessionmaker:
+    """
+    获取读请求使用的会话工厂
+
+    当前用户处于读己之写窗口内时返回主库会话工厂，否则返回只读副本会话工厂
+    """
+    return SessionLocal if read_your_writes.is_pinned(current_user_id.get()) else ReadSessionLocal
+
+
+def async_read_session_factory() -> AsyncDatabase:
+    """
+    获取异步读请求使用的会话工厂（路由规则同 read_session_factory）
+    """
+    return AsyncSessionLocal if read_your_writes.is_pinned(current_user_id.get()) else AsyncReadSessionLocal
+
+
+def create_tables(bind: Optional[Engine] = None):
     """
     创建所有数据库表
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=bind or engine)
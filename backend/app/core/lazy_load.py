@@ -0,0 +1,103 @@
+"""
+ORM 延迟加载（N+1）检测
+开发和测试环境中检测关系属性的延迟加载，按配置告警或抛出异常，并记录发生的路由和属性
+"""
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的 ASGI scope，由请求中间件设置；路由匹配后 scope 中才有 "route"
+current_request_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+
+def _current_route() -> str:
+    scope = current_request_scope.get()
+    if scope is None:
+        return "<no request>"
+    route = scope.get("route")
+    path = route.path if route is not None else scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+class LazyLoadError(RuntimeError):
+    """在 raise 模式下发生了不在白名单中的延迟加载"""
+
+
+class LazyLoadDetector:
+    """延迟加载检测器"""
+
+    MODES = ("off", "warn", "raise")
+
+    def __init__(self, mode: str = "off", allowlist: Iterable[str] = ()):
+        """
+        初始化延迟加载检测器
+
+        Args:
+            mode: off: 不检测；warn: 记录告警日志；raise: 抛出 LazyLoadError
+            allowlist: 允许延迟加载的关系属性，如 "User.roles"
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported LAZY_LOAD_MODE: {mode}")
+        self.mode = mode
+        self.allowlist = frozenset(allowlist)
+        # (路由, 属性) -> 次数
+        self._occurrences: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def check(self, orm_execute_state: ORMExecuteState) -> None:
+        """检查一次 ORM 查询是否为延迟加载"""
+        if not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+            return
+        # 由外层加载发起的加载（刷新过期对象时重新执行预加载选项、显式 refresh）不是 N+1
+        if "sa_top_level_orm_context" in orm_execute_state.execution_options:
+            return
+        attribute = str(orm_execute_state.loader_strategy_path[-1])
+        if attribute in self.allowlist:
+            return
+
+        route = _current_route()
+        with self._lock:
+            key = (route, attribute)
+            self._occurrences[key] = self._occurrences.get(key, 0) + 1
+
+        message = f"Lazy load of {attribute} in {route}"
+        if self.mode == "raise":
+            raise LazyLoadError(message)
+        logger.warning(message)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """获取已检测到的延迟加载，按次数倒序"""
+        with self._lock:
+            items = sorted(self._occurrences.items(), key=lambda item: -item[1])
+        return [
+            {"route": route, "attribute": attribute, "count": count}
+            for (route, attribute), count in items
+        ]
+
+    def reset(self) -> None:
+        """清空检测记录"""
+        with self._lock:
+            self._occurrences.clear()
+
+
+def install_lazy_load_detector(detector: LazyLoadDetector) -> None:
+    """为所有会话注册延迟加载检测"""
+    if detector.enabled:
+        event.listen(Session, "do_orm_execute", detector.check)
+
+
+# 全局延迟加载检测实例
+lazy_load_detector = LazyLoadDetector(mode=settings.LAZY_LOAD_MODE, allowlist=settings.LAZY_LOAD_ALLOWLIST)
+install_lazy_load_detector(lazy_load_detector)
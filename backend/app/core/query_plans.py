@@ -0,0 +1,115 @@
+"""
+查询执行计划检查
+对列表接口的筛选查询和删除、分配前的存在性检查执行 EXPLAIN，出现全表扫描时返回非零退出码，
+用于发现缺失或失效的索引。tests/test_query_plans.py 在迁移后的 SQLite 数据库上执行同样的检查
+
+用法:
+    python -m app.core.query_plans
+"""
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.engine import Connection, Engine
+
+from .database import Base, engine
+
+
+def list_query_statements() -> Dict[str, Select]:
+    """需要走索引的列表筛选查询（与接口使用同一查询语句构建方法）"""
+    from app.services.row_counter import count_statement
+    from app.crud.notification_client import notification_client
+    from app.crud.system_config import crud_system_config
+    from app.crud.user import user
+
+    statements = {
+        "users: is_active": user.search_statement(is_active=True),
+        "users: role_id": user.search_statement(role_id=1),
+        "users: keyword": user.search_statement(keyword="admin"),
+        "system_configs: data_type": crud_system_config.search_statement(data_type="string"),
+        "system_configs: is_active": crud_system_config.search_statement(is_active=True),
+        "system_configs: data_type + is_active": crud_system_config.search_statement(
+            data_type="string", is_active=True
+        ),
+        "system_configs: keyword": crud_system_config.search_statement(keyword="smtp"),
+        "notification_clients: type": notification_client.search_statement(type="email"),
+        "notification_clients: enabled": notification_client.search_statement(enabled=True),
+        "notification_clients: type + enabled": notification_client.search_statement(
+            type="email", enabled=True
+        ),
+        "notification_clients: keyword": notification_client.search_statement(keyword="hook"),
+    }
+    result = {}
+    for name, statement in statements.items():
+        result[f"{name} (page)"] = statement.offset(0).limit(20)
+        result[f"{name} (count)"] = count_statement(statement)
+    return result
+
+
+def guard_query_statements() -> Dict[str, Select]:
+    """需要走索引的存在性检查（EXISTS）"""
+    from app.crud.permission import permission
+    from app.crud.role import role
+
+    return {
+        "roles: has users": role.has_users_statement(1),
+        "roles: has permission": role.has_permission_statement(1, 1),
+        "permissions: has roles": permission.has_roles_statement(1),
+    }
+
+
+def _explain_sqlite(connection: Connection, sql: str) -> Tuple[List[str], List[str]]:
+    plan = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    scanned = []
+    for line in plan:
+        # "SCAN user" 为全表扫描；"SEARCH ... USING INDEX" 为索引查找
+        match = re.match(r"SCAN (\w+)(?: |$)", line)
+        if match and match.group(1) in Base.metadata.tables and "USING" not in line:
+            scanned.append(match.group(1))
+    return plan, scanned
+
+
+def _explain_postgresql(connection: Connection, sql: str) -> Tuple[List[str], List[str]]:
+    # 小表上规划器总会选择顺序扫描，关闭后仍出现顺序扫描说明没有可用索引
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}")]
+    scanned = [match.group(1) for line in plan for match in [re.search(r"Seq Scan on \"?(\w+)", line)] if match]
+    return plan, scanned
+
+
+def check_query_plans(bind: Engine = engine) -> List[Tuple[str, List[str], List[str]]]:
+    """
+    对列表查询和存在性检查执行 EXPLAIN
+
+    Returns:
+        (查询名称, 执行计划, 全表扫描的表) 列表
+    """
+    explain = {"sqlite": _explain_sqlite, "postgresql": _explain_postgresql}.get(bind.dialect.name)
+    if explain is None:
+        raise ValueError(f"Query plan check is not supported for {bind.dialect.name}")
+
+    results = []
+    with bind.connect() as connection:
+        statements = {**list_query_statements(), **guard_query_statements()}
+        for name, statement in statements.items():
+            sql = str(statement.compile(bind, compile_kwargs={"literal_binds": True}))
+            with connection.begin():
+                plan, scanned = explain(connection, sql)
+            results.append((name, plan, scanned))
+    return results
+
+
+def main(argv: Optional[list] = None) -> int:
+    failures = 0
+    for name, plan, scanned in check_query_plans():
+        status = f"FULL SCAN on {', '.join(scanned)}" if scanned else "ok"
+        print(f"{name}: {status}")
+        for line in plan:
+            print(f"    {line}")
+        failures += bool(scanned)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+数据库结构版本管理
+启动时只查询一次 alembic_version，与代码中打包的迁移版本比较；
+表结构由 Alembic 迁移管理，空数据库按模型建表后标记为最新版本
+
+用法:
+    python -m app.core.schema check       # 检查数据库版本
+    python -m app.core.schema upgrade     # 加锁执行迁移到最新版本（空数据库直接建表并标记为最新版本）
+    python -m app.core.schema create-all  # 开发环境：直接建表并标记为最新版本
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .config import settings
+from . import search  # noqa: F401  注册建表后创建搜索索引的事件
+from .database import create_tables, engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 多进程同时迁移时使用的锁标识
+MIGRATION_LOCK_ID = 7_305_114_801
+
+
+class SchemaVersionError(RuntimeError):
+    """数据库结构版本与代码不一致"""
+
+
+def alembic_config() -> Config:
+    """
+    创建指向当前数据库的 Alembic 配置
+
+    不加载 alembic.ini 中的日志配置，避免在应用内运行迁移时覆盖应用的日志设置
+    """
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+    return config
+
+
+@lru_cache(maxsize=1)
+def get_packaged_head() -> str:
+    """获取代码中打包的最新迁移版本"""
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    if head is None:
+        raise SchemaVersionError("No Alembic revisions found")
+    return head
+
+
+def get_database_revision(bind: Engine = engine) -> Optional[str]:
+    """查询数据库当前的迁移版本，未初始化时返回 None"""
+    try:
+        with bind.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except (OperationalError, ProgrammingError):
+        # alembic_version 表不存在
+        return None
+
+
+def check_schema(bind: Engine = engine) -> None:
+    """检查数据库版本，与代码不一致时抛出 SchemaVersionError"""
+    head = get_packaged_head()
+    current = get_database_revision(bind)
+    if current is None and is_empty_database(bind):
+        raise SchemaVersionError(
+            f"Database is not initialized, expected revision {head}. "
+            "Run `python -m app.core.schema upgrade` to create the tables before starting."
+        )
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current or '<none>'}, expected {head}. "
+            "Run `python -m app.core.schema upgrade` (or `alembic upgrade head`) before starting."
+        )
+
+
+def is_empty_database(bind: Engine = engine) -> bool:
+    """数据库中是否还没有任何表"""
+    return not inspect(bind).get_table_names()
+
+
+@contextlib.contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """进程间文件锁：POSIX 使用 fcntl.flock，Windows 使用 msvcrt.locking"""
+    with open(path, "a+") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK 重试 10 秒后仍未拿到锁时抛出 OSError，继续等待
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def migration_lock(bind: Engine = engine) -> Iterator[None]:
+    """
+    迁移锁，保证多个工作进程同时启动时只有一个执行迁移
+
+    PostgreSQL 使用 advisory lock，MySQL 使用 GET_LOCK，SQLite 使用数据库文件旁的文件锁
+    """
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        with bind.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    elif dialect == "mysql":
+        with bind.connect() as connection:
+            connection.execute(text("SELECT GET_LOCK(:name, -1)"), {"name": f"migrate-{MIGRATION_LOCK_ID}"})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": f"migrate-{MIGRATION_LOCK_ID}"})
+    else:
+        database = make_url(str(bind.url)).database
+        if not database or database == ":memory:":
+            yield
+            return
+        with _file_lock(f"{database}.migrate.lock"):
+            yield
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """
+    加锁后迁移到最新版本；其他进程已完成迁移时直接返回
+
+    空数据库不逐个重放迁移历史，按模型建表并标记为最新版本（与 create-all 相同）
+    """
+    head = get_packaged_head()
+    if get_database_revision(bind) == head:
+        return
+    with migration_lock(bind):
+        # 等待锁期间其他进程可能已经完成迁移
+        current = get_database_revision(bind)
+        if current == head:
+            return
+        if current is None and is_empty_database(bind):
+            logger.info(f"Initializing empty database at {head}")
+            _create_all_and_stamp(bind)
+            return
+        logger.info(f"Upgrading database schema from {current or '<none>'} to {head}")
+        command.upgrade(alembic_config(), "head")
+
+
+def _create_all_and_stamp(bind: Engine = engine) -> None:
+    import app.models  # noqa: F401  注册所有模型
+
+    create_tables(bind)
+    command.stamp(alembic_config(), "head")
+
+
+def create_all_for_development() -> None:
+    """开发环境：按模型直接建表，并将数据库标记为最新迁移版本"""
+    if settings.ENVIRONMENT == "production":
+        raise SchemaVersionError(
+            "create-all is a development command, use `python -m app.core.schema upgrade` in production"
+        )
+    _create_all_and_stamp()
+
+
+def ensure_schema() -> None:
+    """
+    应用启动时的数据库版本处理
+
+    - check: 版本不一致时启动失败
+    - migrate: 加锁执行迁移，空数据库直接建表并标记为最新版本
+    - off: 不检查
+    """
+    mode = settings.SCHEMA_CHECK_MODE
+    if mode == "check":
+        check_schema()
+    elif mode == "migrate":
+        upgrade_schema()
+    elif mode != "off":
+        raise ValueError(f"Unsupported SCHEMA_CHECK_MODE: {mode}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.core.schema", description="数据库结构版本管理")
+    parser.add_argument("action", choices=["check", "upgrade", "create-all"])
+    args = parser.parse_args(argv)
+
+    try:
+        if args.action == "check":
+            check_schema()
+            print(f"Database schema is up to date ({get_packaged_head()})")
+        elif args.action == "upgrade":
+            upgrade_schema()
+            print(f"Database schema upgraded to {get_packaged_head()}")
+        else:
+            create_all_for_development()
+            print(f"Tables created and stamped at {get_packaged_head()}")
+    except SchemaVersionError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
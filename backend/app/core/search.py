@@ -0,0 +1,146 @@
+"""
+关键词搜索索引
+模型通过 __search_fields__ 声明参与关键词搜索的字段：
+- SQLite 使用 FTS5 trigram 全文索引（外部内容表），由触发器在增删改时同步
+- PostgreSQL 使用 pg_trgm GIN 索引，ILIKE '%kw%' 可直接走索引
+- 其他数据库以及少于 3 个字符的关键词退回 ILIKE 查询
+
+用法:
+    python -m app.core.search rebuild  # 重建全文索引
+"""
+import argparse
+import sys
+from typing import Any, List, Optional, Type
+
+from sqlalchemy import column, event, or_, select, table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.elements import ColumnElement
+
+from .database import Base, engine
+
+# trigram 索引能匹配的最短关键词
+SEARCH_MIN_LENGTH = 3
+
+
+def search_fields(model: Type[Any]) -> tuple:
+    """模型参与关键词搜索的字段"""
+    return getattr(model, "__search_fields__", ())
+
+
+def fts_table_name(table_name: str) -> str:
+    """SQLite 全文索引表名"""
+    return f"{table_name}_fts"
+
+
+def search_index_ddl(table_name: str, fields: tuple, dialect: str) -> List[str]:
+    """创建搜索索引的语句（包括同步触发器和已有数据的索引构建）"""
+    if dialect == "sqlite":
+        fts = fts_table_name(table_name)
+        columns = ", ".join(f'"{field}"' for field in fields)
+        new_values = ", ".join(f'new."{field}"' for field in fields)
+        old_values = ", ".join(f'old."{field}"' for field in fields)
+        delete_old = f'INSERT INTO "{fts}"("{fts}", rowid, {columns}) VALUES (\'delete\', old.id, {old_values});'
+        insert_new = f'INSERT INTO "{fts}"(rowid, {columns}) VALUES (new.id, {new_values});'
+        return [
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5('
+            f'{columns}, content=\'{table_name}\', content_rowid=\'id\', tokenize=\'trigram\')',
+            f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table_name}" BEGIN {insert_new} END',
+            f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table_name}" BEGIN {delete_old} END',
+            # 只在搜索字段变化时更新索引，登录统计等更新不受影响
+            f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF {columns} ON "{table_name}" '
+            f'BEGIN {delete_old} {insert_new} END',
+            f'INSERT INTO "{fts}"("{fts}") VALUES (\'rebuild\')',
+        ]
+    if dialect == "postgresql":
+        return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{field}_trgm" '
+            f'ON "{table_name}" USING gin ("{field}" gin_trgm_ops)'
+            for field in fields
+        ]
+    return []
+
+
+def drop_search_index_ddl(table_name: str, fields: tuple, dialect: str) -> List[str]:
+    """删除搜索索引的语句"""
+    if dialect == "sqlite":
+        fts = fts_table_name(table_name)
+        return [f'DROP TRIGGER IF EXISTS "{fts}_{suffix}"' for suffix in ("ai", "ad", "au")] + [
+            f'DROP TABLE IF EXISTS "{fts}"'
+        ]
+    if dialect == "postgresql":
+        return [f'DROP INDEX IF EXISTS "ix_{table_name}_{field}_trgm"' for field in fields]
+    return []
+
+
+def _searchable_tables(tables: Optional[list] = None) -> List[tuple]:
+    """(表名, 搜索字段) 列表，tables 不为空时只包含其中的表"""
+    names = None if tables is None else {t.name for t in tables}
+    result = []
+    for mapper in Base.registry.mappers:
+        fields = search_fields(mapper.class_)
+        name = mapper.local_table.name
+        if fields and (names is None or name in names):
+            result.append((name, fields))
+    return result
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_indexes(target, connection: Connection, tables: Optional[list] = None, **kw) -> None:
+    """create_all 建表后创建搜索索引"""
+    for table_name, fields in _searchable_tables(tables):
+        for statement in search_index_ddl(table_name, fields, connection.dialect.name):
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_indexes(target, connection: Connection, tables: Optional[list] = None, **kw) -> None:
+    """drop_all 删表前删除搜索索引"""
+    for table_name, fields in _searchable_tables(tables):
+        for statement in drop_search_index_ddl(table_name, fields, connection.dialect.name):
+            connection.exec_driver_sql(statement)
+
+
+def _fts_match(model: Type[Any], keyword: str) -> tuple:
+    """(全文索引表, MATCH 条件)，关键词作为短语匹配，即任意字段包含该子串"""
+    name = fts_table_name(model.__table__.name)
+    fts = table(name, column("rowid"), column(name))
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    return fts, fts.c[name].op("MATCH")(phrase)
+
+
+def _uses_fts(keyword: str) -> bool:
+    return engine.dialect.name == "sqlite" and len(keyword) >= SEARCH_MIN_LENGTH
+
+
+def keyword_filter(model: Type[Any], keyword: str) -> ColumnElement:
+    """
+    关键词筛选条件：任一搜索字段包含关键词（不区分大小写）
+    """
+    if _uses_fts(keyword):
+        fts, match = _fts_match(model, keyword)
+        return model.id.in_(select(fts.c.rowid).where(match))
+    return or_(*(getattr(model, field).ilike(f"%{keyword}%") for field in search_fields(model)))
+
+
+def rebuild_search_indexes(bind: Engine = engine) -> None:
+    """重新创建并构建所有搜索索引"""
+    import app.models  # noqa: F401  注册所有模型
+
+    with bind.begin() as connection:
+        for table_name, fields in _searchable_tables():
+            for statement in search_index_ddl(table_name, fields, connection.dialect.name):
+                connection.exec_driver_sql(statement)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.core.search", description="关键词搜索索引")
+    parser.add_argument("action", choices=["rebuild"])
+    parser.parse_args(argv)
+
+    rebuild_search_indexes()
+    print("Search indexes rebuilt")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 """
 安全相关工具函数
 """
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, List, Tuple, Union, Optional
 from jose import jwt
 from passlib.context import CryptContext
 
@@ -12,11 +18,225 @@ from .config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def _summarize(samples: Deque[float]) -> Dict[str, float]:
+    """汇总耗时样本(毫秒)"""
+    if not samples:
+        return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg_ms": round(sum(ordered) / len(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+class PasswordHasher:
+    """
+    密码哈希执行器
+
+    bcrypt 计算在独立的线程池中执行，与处理请求的 anyio 线程池隔离，
+    登录高峰时不会占满其他接口的工作线程
+    """
+
+    def __init__(self, max_workers: int = 4, sample_size: int = 1000):
+        """
+        初始化密码哈希执行器
+
+        Args:
+            max_workers: 同时进行哈希计算的最大线程数
+            sample_size: 用于统计耗时的最近样本数
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_samples: Deque[float] = deque(maxlen=sample_size)
+        self._hash_samples: Deque[float] = deque(maxlen=sample_size)
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """同步执行哈希计算"""
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """异步执行哈希计算"""
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def map(self, fn: Callable[..., Any], values: Iterable[Any]) -> List[Any]:
+        """对多个值并行执行哈希计算，结果顺序与输入一致"""
+        futures = [self._submit(fn, value) for value in values]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器统计信息"""
+        with self._lock:
+            wait_samples = deque(self._wait_samples)
+            hash_samples = deque(self._hash_samples)
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "queue_wait": _summarize(wait_samples),
+                "hash_latency": _summarize(hash_samples),
+            }
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._executor is None:
+                # 首次使用时创建，避免多进程部署在 fork 前创建线程
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+            self._queued += 1
+            executor = self._executor
+        return executor.submit(self._measure, fn, time.perf_counter(), *args)
+
+    def _measure(self, fn: Callable[..., Any], enqueued_at: float, *args: Any) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_samples.append((started_at - enqueued_at) * 1000)
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_samples.append((finished_at - started_at) * 1000)
+
+
+# 全局密码哈希执行器
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+class TokenCache:
+    """
+    已验证令牌的 LRU 缓存
+
+    以令牌摘要为键缓存解码后的载荷，条目过期时间不晚于令牌自身的 exp。
+    吊销的令牌记入拒绝列表直到其 exp，拒绝列表只在当前进程内有效
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: int = 300):
+        """
+        初始化令牌缓存
+
+        Args:
+            max_size: 最大缓存条目数，0 表示禁用缓存
+            ttl: 条目最长有效期(秒)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # 已吊销令牌摘要 -> 令牌过期时间，过期后令牌本身即无效，可从列表中移除
+        self._revoked: Dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """获取缓存的载荷，未命中或已过期返回 None"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """缓存已验证的载荷"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> None:
+        """移除指定令牌的缓存条目（只移除缓存，令牌再次使用时会重新解码并缓存）"""
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def revoke(self, token: str, expires_at: float) -> None:
+        """吊销令牌：移除缓存条目，并在 expires_at 之前拒绝该令牌"""
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked = {k: exp for k, exp in self._revoked.items() if exp > now}
+            if expires_at > now:
+                self._revoked[key] = expires_at
+
+    def is_revoked(self, token: str) -> bool:
+        """令牌是否已被吊销（拒绝列表为空时不计算摘要）"""
+        if not self._revoked:
+            return False
+        with self._lock:
+            expires_at = self._revoked.get(self._key(token))
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "revoked": len(self._revoked),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# 全局令牌缓存
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None
 ) -> str:
     """
     创建访问令牌
+
+    Args:
+        subject: 令牌主体（用户ID）
+        expires_delta: 有效期
+        claims: 额外嵌入的声明
     """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -24,7 +244,8 @@ def create_access_token(
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = dict(claims or {})
+    to_encode.update({"exp": expire, "sub": str(subject)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -32,28 +253,87 @@ def create_access_token(
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     验证密码
+
+    在密码哈希线程池中计算，但调用线程会一直等待结果：在同步接口中调用时仍占用一个请求线程，
+    异步接口应使用 verify_password_async
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     获取密码哈希
+
+    与 verify_password 相同，调用线程会一直等待结果，异步接口应使用 get_password_hash_async
     """
-    return pwd_context.hash(password)
+    return password_hasher.run(pwd_context.hash, password)
 
 
-def verify_token(token: str) -> Optional[str]:
+def get_password_hashes(passwords: Iterable[str]) -> List[str]:
     """
-    验证令牌并返回用户ID
+    批量获取密码哈希（在密码哈希线程池中并行计算，调用线程等待全部完成）
+    """
+    return password_hasher.map(pwd_context.hash, passwords)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    异步验证密码
+    """
+    return await password_hasher.run_async(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    异步获取密码哈希
+    """
+    return await password_hasher.run_async(pwd_context.hash, password)
+
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    验证令牌并返回载荷（优先使用令牌缓存）
+
+    返回载荷的副本，调用方修改返回值不会影响缓存条目
     """
+    if token_cache.is_revoked(token):
+        return None
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return user_id
     except jwt.JWTError:
         return None
+    if payload.get("sub") is None:
+        return None
+    token_cache.put(token, dict(payload))
+    return payload
+
+
+def revoke_token(token: str) -> None:
+    """
+    吊销令牌：在令牌过期前 decode_token 都返回 None
+
+    拒绝列表只在当前进程内有效，多进程部署需要在每个进程中吊销或使用共享存储
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.JWTError:
+        # 无效或已过期的令牌本来就会被拒绝
+        return
+    exp = payload.get("exp")
+    expires_at = exp if isinstance(exp, (int, float)) else time.time() + token_cache.ttl
+    token_cache.revoke(token, expires_at)
+
+
+def verify_token(token: str) -> Optional[str]:
+    """
+    验证令牌并返回用户ID
+    """
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload["sub"]
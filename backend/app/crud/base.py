@@ -1,21 +1,45 @@
 """
 基础 CRUD 操作
 """
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
-from fastapi.encoders import jsonable_encoder
+import re
+from functools import cached_property
+from typing import Any, Callable, Dict, FrozenSet, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from pydantic import BaseModel
+from sqlalchemy import Column, Select, Table, UniqueConstraint, bindparam, delete, exists, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import Base
+from app.schemas.bulk import BulkItemResult, BulkResult
+from app.utils.pagination import Page, PageParams, Paginator, paginate, paginate_async
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# 批量写入的条目：(请求中的序号, 对象ID, 列值)
+BulkItem = Tuple[int, Optional[int], Dict[str, Any]]
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """按固定大小切分序列"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def integrity_error_message(error: IntegrityError) -> str:
+    """数据库约束错误的简短描述"""
+    return str(error.orig).splitlines()[0]
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     基础 CRUD 操作类
+
+    查询语句由 *_statement 方法构建，同步方法和异步方法（*_async）共用同一语句。
+    写入方法只刷新不提交，事务由调用方提交（API 请求中由 get_db 在请求结束时统一提交）
     """
     
     def __init__(self, model: Type[ModelType]):
@@ -27,23 +51,77 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
     
+    def get_statement(self, id: Any) -> Select:
+        """根据 ID 获取单个对象的查询语句"""
+        return select(self.model).where(self.model.id == id)
+    
+    def get_multi_statement(self, *, skip: int = 0, limit: int = 100) -> Select:
+        """获取多个对象的查询语句"""
+        return select(self.model).offset(skip).limit(limit)
+    
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """根据 ID 获取单个对象"""
-        return db.query(self.model).filter(self.model.id == id).first()
+        return db.scalars(self.get_statement(id)).first()
+    
+    def exists_statement(self, id: Any) -> Select:
+        """判断对象是否存在的查询语句（EXISTS，不加载对象）"""
+        return select(exists().where(self.model.id == id))
+    
+    def exists(self, db: Session, id: Any) -> bool:
+        """根据 ID 判断对象是否存在"""
+        return db.scalar(self.exists_statement(id))
     
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
         """获取多个对象"""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return db.scalars(self.get_multi_statement(skip=skip, limit=limit)).all()
+    
+    async def get_async(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """根据 ID 获取单个对象（异步）"""
+        return (await db.scalars(self.get_statement(id))).first()
+    
+    async def get_multi_async(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        """获取多个对象（异步）"""
+        return (await db.scalars(self.get_multi_statement(skip=skip, limit=limit))).all()
+    
+    def paginator(self, statement: Select, params: PageParams, **kwargs: Any) -> Paginator:
+        """
+        创建分页查询构建器，键集分页默认按 ID 排序
+
+        Args:
+            statement: 不含分页的查询语句
+            params: 分页参数
+            **kwargs: sort_column、descending 等 Paginator 参数
+        """
+        return Paginator(statement, params, id_column=self.model.id, **kwargs)
     
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        """创建新对象"""
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
+    def get_page(self, db: Session, statement: Select, params: PageParams, **kwargs: Any) -> Page[ModelType]:
+        """分页查询（偏移分页或游标分页，可不统计总数）"""
+        return paginate(db, self.paginator(statement, params, **kwargs))
+    
+    async def get_page_async(
+        self, db: AsyncSession, statement: Select, params: PageParams, **kwargs: Any
+    ) -> Page[ModelType]:
+        """分页查询（异步）"""
+        return await paginate_async(db, self.paginator(statement, params, **kwargs))
+    
+    def create(self, db: Session, *, obj_in: CreateSchemaType, refresh: bool = False) -> ModelType:
+        """
+        创建新对象
+
+        插入语句通过 RETURNING 取回主键和服务端默认值，默认不再重新查询
+
+        Args:
+            refresh: 是否重新查询整行（需要触发器等数据库端生成的值时使用）
+        """
+        db_obj = self.model(**self.column_values(obj_in))
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
+        if refresh:
+            db.refresh(db_obj)
         return db_obj
     
     def update(
@@ -51,25 +129,300 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        refresh: bool = False
     ) -> ModelType:
-        """更新对象"""
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
+        """
+        更新对象，只写入提供了的字段
+
+        支持 RETURNING 的数据库用一条 UPDATE ... RETURNING 写入并取回整行（包括 onupdate 生成的值），
+        其他数据库由会话刷新时写入。
+        执行 UPDATE 前先刷新会话：会话关闭了 autoflush，populate_existing 会用返回的行覆盖
+        db_obj 上尚未写入的修改
+
+        Args:
+            refresh: 是否重新查询整行
+        """
+        values = self.column_values(obj_in, exclude_unset=True)
+        if values and db.get_bind().dialect.update_returning:
+            db.flush()
+            statement = (
+                update(self.model)
+                .where(self.model.id == db_obj.id)
+                .values(values)
+                .returning(self.model)
+                .execution_options(populate_existing=True)
+            )
+            db_obj = db.scalars(statement).one()
         else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+            for key, value in values.items():
+                setattr(db_obj, key, value)
+            db.flush()
+        if refresh:
+            db.refresh(db_obj)
         return db_obj
     
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        """删除对象"""
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
-        db.commit()
+    def remove(self, db: Session, *, id: int) -> Optional[ModelType]:
+        """
+        删除对象，同时删除多对多关联表中的记录
+
+        支持 RETURNING 的数据库用一条 DELETE ... RETURNING 删除并取回被删除的对象，不再先查询；
+        对象不存在时返回 None
+        """
+        for secondary, column in self._secondary_columns():
+            db.execute(delete(secondary).where(column == id))
+        statement = delete(self.model).where(self.model.id == id)
+        if db.get_bind().dialect.delete_returning:
+            obj = db.scalars(statement.returning(self.model)).first()
+        else:
+            obj = self.get(db, id)
+            db.execute(statement)
         return obj
+    
+    def create_many(
+        self, db: Session, *, objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]]
+    ) -> BulkResult:
+        """
+        批量创建对象
+
+        分块 executemany 插入，各块在同一事务中；违反唯一约束等错误按条目报告，不影响其他条目
+        """
+        rows = [self.column_values(obj_in) for obj_in in objs_in]
+        result = self._insert_many(db, rows)
+        return result
+    
+    def update_many(
+        self, db: Session, *, objs_in: Sequence[Union[BaseModel, Dict[str, Any]]]
+    ) -> BulkResult:
+        """
+        批量更新对象
+
+        Args:
+            objs_in: 包含 id 的更新内容（如 RoleBulkUpdate），只更新提供了的字段
+        """
+        rows = []
+        for obj_in in objs_in:
+            data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+            rows.append((data["id"], self.column_values(data)))
+        result = self._update_many(db, rows)
+        return result
+    
+    def remove_many(
+        self, db: Session, *, ids: Sequence[int], rejected: Optional[Dict[int, str]] = None
+    ) -> BulkResult:
+        """
+        批量删除对象，同时删除多对多关联表中的记录
+
+        Args:
+            ids: 要删除的对象ID
+            rejected: 不允许删除的对象ID -> 原因，作为失败条目报告
+        """
+        result = self._delete_many(db, ids, rejected or {})
+        return result
+    
+    def unique_violation(self, error: IntegrityError) -> Optional[str]:
+        """
+        从数据库约束错误中识别违反唯一约束的列名，无法识别时返回 None
+
+        按列名匹配 SQLite（UNIQUE constraint failed: user.email）和 PostgreSQL（Key (email)=...）的错误信息，
+        按唯一索引/约束名匹配 MySQL（Duplicate entry 'x' for key 'user.ix_user_email'）等只报告约束名的错误信息
+        """
+        message = str(error.orig)
+        for column, names in self.unique_keys.items():
+            if any(pattern.search(message) for pattern in names):
+                return column
+        return None
+    
+    @cached_property
+    def unique_keys(self) -> Dict[str, Tuple[re.Pattern, ...]]:
+        """单列唯一约束的列名 -> 错误信息中可能出现的标识（列名和唯一索引/约束名），取自表定义并缓存"""
+        table = self.model.__table__
+        keys: Dict[str, List[str]] = {}
+        for column in table.columns:
+            if column.unique:
+                keys.setdefault(column.name, []).extend(
+                    [rf"\b{re.escape(table.name)}\.{re.escape(column.name)}\b", rf"Key \({re.escape(column.name)}\)="]
+                )
+        for constraint in [*table.indexes, *table.constraints]:
+            unique = isinstance(constraint, UniqueConstraint) or getattr(constraint, "unique", False)
+            columns = list(constraint.columns)
+            if unique and len(columns) == 1 and isinstance(constraint.name, str):
+                keys.setdefault(columns[0].name, []).append(rf"\b{re.escape(constraint.name)}\b")
+        return {column: tuple(re.compile(pattern) for pattern in patterns) for column, patterns in keys.items()}
+    
+    @cached_property
+    def column_keys(self) -> FrozenSet[str]:
+        """可写入的列属性名（不包括主键），取自映射器并缓存"""
+        mapper = self.model.__mapper__
+        primary_keys = {column.key for column in mapper.primary_key}
+        return frozenset(attr.key for attr in mapper.column_attrs if attr.key not in primary_keys)
+    
+    def column_values(
+        self, obj_in: Union[BaseModel, Dict[str, Any]], *, exclude_unset: bool = False
+    ) -> Dict[str, Any]:
+        """取出输入中属于数据表列的字段（不包括主键）"""
+        data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=exclude_unset)
+        columns = self.column_keys
+        return {key: value for key, value in data.items() if key in columns}
+    
+    def _insert_many(self, db: Session, rows: Sequence[Dict[str, Any]]) -> BulkResult:
+        """不提交事务的批量插入"""
+        result = BulkResult()
+        items = self._reject_unique_conflicts(
+            db, [(index, None, row) for index, row in enumerate(rows)], result
+        )
+        self._run_grouped(db, items, result, self._insert_rows)
+        return self._sorted(result)
+    
+    def _update_many(self, db: Session, rows: Sequence[Tuple[int, Dict[str, Any]]]) -> BulkResult:
+        """不提交事务的批量更新"""
+        result = BulkResult()
+        items = self._reject_missing(db, [(index, id, values) for index, (id, values) in enumerate(rows)], result)
+        items = self._reject_unique_conflicts(db, items, result)
+        self._run_grouped(db, items, result, self._update_rows)
+        return self._sorted(result)
+    
+    def _delete_many(self, db: Session, ids: Sequence[int], rejected: Dict[int, str]) -> BulkResult:
+        """不提交事务的批量删除"""
+        result = BulkResult()
+        items = []
+        for index, id in enumerate(ids):
+            if id in rejected:
+                result.failed.append(BulkItemResult(index=index, id=id, error=rejected[id]))
+            else:
+                items.append((index, id, {}))
+        items = self._reject_missing(db, items, result)
+        for chunk in chunked(items, settings.BULK_CHUNK_SIZE):
+            self._run_chunk(db, chunk, result, self._delete_rows)
+        return self._sorted(result)
+    
+    def _run_grouped(
+        self, db: Session, items: List[BulkItem], result: BulkResult, execute: Callable[[Session, Sequence[BulkItem]], List[int]]
+    ) -> None:
+        """按列集合分组后分块执行，同一条 executemany 语句的参数必须包含相同的列"""
+        groups: Dict[Tuple[str, ...], List[BulkItem]] = {}
+        for item in items:
+            groups.setdefault(tuple(sorted(item[2])), []).append(item)
+        for group in groups.values():
+            for chunk in chunked(group, settings.BULK_CHUNK_SIZE):
+                self._run_chunk(db, chunk, result, execute)
+    
+    def _run_chunk(
+        self, db: Session, chunk: Sequence[BulkItem], result: BulkResult, execute: Callable[[Session, Sequence[BulkItem]], List[int]]
+    ) -> None:
+        """在保存点中执行一块写入；违反约束时逐条重试以定位失败的条目"""
+        try:
+            with db.begin_nested():
+                ids = execute(db, chunk)
+        except IntegrityError:
+            for item in chunk:
+                try:
+                    with db.begin_nested():
+                        ids = execute(db, [item])
+                except IntegrityError as e:
+                    result.failed.append(BulkItemResult(index=item[0], id=item[1], error=integrity_error_message(e)))
+                else:
+                    result.succeeded.append(BulkItemResult(index=item[0], id=ids[0]))
+        else:
+            result.succeeded.extend(BulkItemResult(index=item[0], id=id) for item, id in zip(chunk, ids))
+    
+    def _insert_rows(self, db: Session, chunk: Sequence[BulkItem]) -> List[int]:
+        table = self.model.__table__
+        rows = [values for _, _, values in chunk]
+        if db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            # 一条 INSERT ... RETURNING 取回全部主键，顺序与参数一致
+            return list(db.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows))
+        return [db.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+    
+    def _update_rows(self, db: Session, chunk: Sequence[BulkItem]) -> List[int]:
+        table = self.model.__table__
+        ids = [id for _, id, _ in chunk]
+        keys = list(chunk[0][2])
+        if keys:
+            statement = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values({key: bindparam(f"b_{key}") for key in keys})
+            )
+            db.execute(statement, [
+                {"b_id": id, **{f"b_{key}": value for key, value in values.items()}}
+                for _, id, values in chunk
+            ])
+        return ids
+    
+    def _delete_rows(self, db: Session, chunk: Sequence[BulkItem]) -> List[int]:
+        table = self.model.__table__
+        ids = [id for _, id, _ in chunk]
+        for secondary, column in self._secondary_columns():
+            db.execute(delete(secondary).where(column.in_(ids)))
+        db.execute(delete(table).where(table.c.id.in_(ids)))
+        return ids
+    
+    def _secondary_columns(self) -> List[Tuple[Table, Column]]:
+        """多对多关联表及其中引用本表主键的列"""
+        table = self.model.__table__
+        result = {}
+        for relationship in self.model.__mapper__.relationships:
+            secondary = relationship.secondary
+            if secondary is None or secondary.name in result:
+                continue
+            for column in secondary.c:
+                if any(fk.column is table.c.id for fk in column.foreign_keys):
+                    result[secondary.name] = (secondary, column)
+        return list(result.values())
+    
+    def _reject_missing(self, db: Session, items: List[BulkItem], result: BulkResult) -> List[BulkItem]:
+        """报告不存在的对象和请求中重复的ID"""
+        table = self.model.__table__
+        existing = set()
+        for chunk in chunked(list({id for _, id, _ in items}), settings.BULK_CHUNK_SIZE):
+            existing.update(db.scalars(select(table.c.id).where(table.c.id.in_(chunk))))
+
+        seen = set()
+        accepted = []
+        for item in items:
+            index, id, _ = item
+            if id not in existing:
+                result.failed.append(BulkItemResult(index=index, id=id, error="Not found"))
+            elif id in seen:
+                result.failed.append(BulkItemResult(index=index, id=id, error="Duplicate id in request"))
+            else:
+                seen.add(id)
+                accepted.append(item)
+        return accepted
+    
+    def _reject_unique_conflicts(self, db: Session, items: List[BulkItem], result: BulkResult) -> List[BulkItem]:
+        """预先检查唯一列：请求内重复或与其他已有对象冲突的条目直接报告失败"""
+        table = self.model.__table__
+        errors: Dict[int, str] = {}
+        for column in table.columns:
+            if not column.unique or column.primary_key:
+                continue
+            candidates = [
+                (index, id, values[column.key]) for index, id, values in items
+                if values.get(column.key) is not None and index not in errors
+            ]
+            first_index: Dict[Any, int] = {}
+            for index, _, value in candidates:
+                if value in first_index:
+                    errors[index] = f"Duplicate {column.key} in request: {value}"
+                else:
+                    first_index[value] = index
+
+            owners: Dict[Any, int] = {}
+            for chunk in chunked(list(first_index), settings.BULK_CHUNK_SIZE):
+                owners.update(db.execute(select(column, table.c.id).where(column.in_(chunk))).tuples().all())
+            for index, id, value in candidates:
+                if index not in errors and value in owners and owners[value] != id:
+                    errors[index] = f"{column.key} already exists: {value}"
+
+        for index, id, _ in items:
+            if index in errors:
+                result.failed.append(BulkItemResult(index=index, id=id, error=errors[index]))
+        return [item for item in items if item[0] not in errors]
+    
+    @staticmethod
+    def _sorted(result: BulkResult) -> BulkResult:
+        result.succeeded.sort(key=lambda item: item.index)
+        result.failed.sort(key=lambda item: item.index)
+        return result
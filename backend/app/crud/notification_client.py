@@ -3,11 +3,14 @@
 """
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import Select, and_, select
 
+from app.core.search import keyword_filter
 from app.crud.base import CRUDBase
+from app.services.row_counter import count_statement
 from app.models.notification_client import NotificationClient
 from app.schemas.notification_client import NotificationClientCreate, NotificationClientUpdate
+from app.utils.pagination import Page, PageParams
 
 
 class CRUDNotificationClient(CRUDBase[NotificationClient, NotificationClientCreate, NotificationClientUpdate]):
@@ -50,37 +53,56 @@ class CRUDNotificationClient(CRUDBase[NotificationClient, NotificationClientCrea
             .all()
         )
     
-    def search(
-        self, 
-        db: Session, 
-        *, 
+    def search_statement(
+        self,
+        *,
         keyword: Optional[str] = None,
         type: Optional[str] = None,
-        enabled: Optional[bool] = None,
-        skip: int = 0, 
-        limit: int = 100
-    ) -> List[NotificationClient]:
-        """搜索通知客户端"""
-        query = db.query(NotificationClient)
+        enabled: Optional[bool] = None
+    ) -> Select:
+        """搜索通知客户端的查询语句（按 ID 排序，不含分页）"""
+        statement = select(NotificationClient)
         
-        # 关键词搜索
+        # 关键词搜索（名称、类型），使用全文索引
         if keyword:
-            query = query.filter(
-                or_(
-                    NotificationClient.name.contains(keyword),
-                    NotificationClient.type.contains(keyword)
-                )
-            )
+            statement = statement.where(keyword_filter(NotificationClient, keyword))
         
         # 类型过滤
         if type:
-            query = query.filter(NotificationClient.type == type)
+            statement = statement.where(NotificationClient.type == type)
         
         # 启用状态过滤
         if enabled is not None:
-            query = query.filter(NotificationClient.enabled == enabled)
+            statement = statement.where(NotificationClient.enabled == enabled)
         
-        return query.offset(skip).limit(limit).all()
+        return statement.order_by(NotificationClient.id)
+    
+    def search(
+        self, 
+        db: Session, 
+        *, 
+        keyword: Optional[str] = None,
+        type: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[NotificationClient]:
+        """搜索通知客户端"""
+        statement = self.search_statement(keyword=keyword, type=type, enabled=enabled)
+        return db.scalars(statement.offset(skip).limit(limit)).all()
+    
+    def search_page(
+        self,
+        db: Session,
+        *,
+        page: PageParams,
+        keyword: Optional[str] = None,
+        type: Optional[str] = None,
+        enabled: Optional[bool] = None
+    ) -> Page[NotificationClient]:
+        """搜索通知客户端（支持游标分页）"""
+        statement = self.search_statement(keyword=keyword, type=type, enabled=enabled)
+        return self.get_page(db, statement, page)
     
     def count_search(
         self,
@@ -91,26 +113,8 @@ class CRUDNotificationClient(CRUDBase[NotificationClient, NotificationClientCrea
         enabled: Optional[bool] = None
     ) -> int:
         """搜索结果计数"""
-        query = db.query(NotificationClient)
-        
-        # 关键词搜索
-        if keyword:
-            query = query.filter(
-                or_(
-                    NotificationClient.name.contains(keyword),
-                    NotificationClient.type.contains(keyword)
-                )
-            )
-        
-        # 类型过滤
-        if type:
-            query = query.filter(NotificationClient.type == type)
-        
-        # 启用状态过滤
-        if enabled is not None:
-            query = query.filter(NotificationClient.enabled == enabled)
-        
-        return query.count()
+        statement = self.search_statement(keyword=keyword, type=type, enabled=enabled)
+        return db.scalar(count_statement(statement))
     
     def update_switches(
         self, 
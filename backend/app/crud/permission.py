@@ -1,12 +1,15 @@
 """
 权限 CRUD 操作
 """
-from typing import Optional
+from typing import Any, Dict, Optional, Union
+from sqlalchemy import Select, exists, select
 from sqlalchemy.orm import Session
 
 from app.crud.base import CRUDBase
 from app.models.permission import Permission
+from app.models.role import role_permission_association
 from app.schemas.permission import PermissionCreate, PermissionUpdate
+from app.services.permission_cache import permission_cache
 
 
 class CRUDPermission(CRUDBase[Permission, PermissionCreate, PermissionUpdate]):
@@ -19,6 +22,37 @@ class CRUDPermission(CRUDBase[Permission, PermissionCreate, PermissionUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Optional[Permission]:
         """根据名称获取权限"""
         return db.query(Permission).filter(Permission.name == name).first()
+    
+    def has_roles_statement(self, permission_id: int) -> Select:
+        """权限是否已分配给角色的查询语句（EXISTS，按 permission_id 索引查找一行即可）"""
+        table = role_permission_association
+        return select(exists().where(table.c.permission_id == permission_id))
+    
+    def has_roles(self, db: Session, *, permission_id: int) -> bool:
+        """权限是否已分配给角色（不加载角色）"""
+        return db.scalar(self.has_roles_statement(permission_id))
+    
+    def create(self, db: Session, *, obj_in: PermissionCreate) -> Permission:
+        """创建权限"""
+        db_obj = super().create(db, obj_in=obj_in)
+        permission_cache.invalidate_permission(db, db_obj.id)
+        return db_obj
+    
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Permission,
+        obj_in: Union[PermissionUpdate, Dict[str, Any]]
+    ) -> Permission:
+        """更新权限（权限代码可能变化，需要失效相关用户缓存）"""
+        permission_cache.invalidate_permission(db, db_obj.id)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+    
+    def remove(self, db: Session, *, id: int) -> Optional[Permission]:
+        """删除权限"""
+        permission_cache.invalidate_permission(db, id)
+        return super().remove(db, id=id)
 
 
 permission = CRUDPermission(Permission)
@@ -1,15 +1,22 @@
 """
 角色 CRUD 操作
 """
-from typing import Optional, List, Tuple, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from typing import Optional, List, Sequence, Tuple, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import Select, delete, exists, func, insert, select
 
-from app.crud.base import CRUDBase
-from app.models.role import Role
+from app.core.search import keyword_filter
+from app.core.config import settings
+from app.crud.base import CRUDBase, chunked
+from app.models.role import Role, role_permission_association
 from app.models.permission import Permission
-from app.models.user import User
+from app.models.user import User, user_role_association
+from app.schemas.bulk import BulkResult
 from app.schemas.role import RoleCreate, RoleUpdate
+from app.services.permission_cache import permission_cache
+from app.utils.pagination import Page, PageParams
 
 
 class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
@@ -27,6 +34,103 @@ class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
         """根据名称获取角色"""
         return db.query(Role).filter(Role.name == name).first()
 
+    def remove(self, db: Session, *, id: int) -> Optional[Role]:
+        """删除角色"""
+        permission_cache.invalidate_role(db, id)
+        return super().remove(db, id=id)
+
+    def remove_many(
+        self, db: Session, *, ids: Sequence[int], rejected: Optional[Dict[int, str]] = None
+    ) -> BulkResult:
+        """批量删除角色，已分配给用户的角色不删除"""
+        rejected = dict(rejected or {})
+        for chunk in chunked(list(set(ids)), settings.BULK_CHUNK_SIZE):
+            in_use = db.scalars(
+                select(user_role_association.c.role_id)
+                .where(user_role_association.c.role_id.in_(chunk))
+                .distinct()
+            )
+            for role_id in in_use:
+                rejected.setdefault(role_id, "Cannot delete role that is assigned to users")
+        permission_cache.invalidate_roles(db, [id for id in ids if id not in rejected])
+        return super().remove_many(db, ids=ids, rejected=rejected)
+
+    def set_role_permissions(
+        self, db: Session, *, role_id: int, permission_ids: Sequence[int]
+    ) -> Tuple[int, int]:
+        """
+        替换角色的权限列表，不存在的权限ID被忽略
+
+        权限ID用一条 IN 查询校验，与现有权限按集合求差，只写入变化的部分：
+        新增用一条 executemany INSERT，移除用 DELETE ... IN，不加载权限对象
+
+        Returns:
+            (新增数, 移除数)
+        """
+        table = role_permission_association
+        requested = set(permission_ids)
+        valid = set(db.scalars(select(Permission.id).where(Permission.id.in_(requested)))) if requested else set()
+        current = set(db.scalars(select(table.c.permission_id).where(table.c.role_id == role_id)))
+        added = sorted(valid - current)
+        removed = sorted(current - valid)
+
+        for chunk in chunked(removed, settings.BULK_CHUNK_SIZE):
+            db.execute(delete(table).where(table.c.role_id == role_id, table.c.permission_id.in_(chunk)))
+        if added:
+            db.execute(insert(table), [{"role_id": role_id, "permission_id": id} for id in added])
+
+        if added or removed:
+            self._permissions_changed(db, role_id)
+        return len(added), len(removed)
+
+    def has_users_statement(self, role_id: int) -> Select:
+        """角色是否已分配给用户的查询语句（EXISTS，按 role_id 索引查找一行即可）"""
+        table = user_role_association
+        return select(exists().where(table.c.role_id == role_id))
+
+    def has_users(self, db: Session, *, role_id: int) -> bool:
+        """角色是否已分配给用户（不加载用户）"""
+        return db.scalar(self.has_users_statement(role_id))
+
+    def has_permission_statement(self, role_id: int, permission_id: int) -> Select:
+        """角色是否拥有权限的查询语句（EXISTS，按主键查找）"""
+        table = role_permission_association
+        return select(exists().where(table.c.role_id == role_id, table.c.permission_id == permission_id))
+
+    def has_permission(self, db: Session, *, role_id: int, permission_id: int) -> bool:
+        """角色是否拥有权限（不加载权限集合）"""
+        return db.scalar(self.has_permission_statement(role_id, permission_id))
+
+    def add_permission(self, db: Session, *, role_id: int, permission_id: int) -> None:
+        """为角色添加权限，调用方需先确认角色尚未拥有该权限"""
+        db.execute(insert(role_permission_association).values(role_id=role_id, permission_id=permission_id))
+        self._permissions_changed(db, role_id)
+
+    def remove_permission(self, db: Session, *, role_id: int, permission_id: int) -> None:
+        """移除角色的权限"""
+        table = role_permission_association
+        db.execute(delete(table).where(table.c.role_id == role_id, table.c.permission_id == permission_id))
+        self._permissions_changed(db, role_id)
+
+    def _permissions_changed(self, db: Session, role_id: int) -> None:
+        """直接修改关联表后，使会话中已加载的权限集合过期，并使权限缓存失效"""
+        role = db.identity_map.get(identity_key(Role, role_id))
+        if role is not None:
+            db.expire(role, ["permissions"])
+        permission_cache.invalidate_role(db, role_id)
+
+    def search_statement(self, *, keyword: Optional[str] = None) -> Select:
+        """
+        角色搜索的查询语句（按 ID 排序，不含分页）
+        """
+        statement = select(Role)
+
+        # 关键词搜索（名称、描述），使用全文索引
+        if keyword:
+            statement = statement.where(keyword_filter(Role, keyword))
+
+        return statement.order_by(Role.id)
+
     def get_multi_with_search(
         self,
         db: Session,
@@ -38,23 +142,27 @@ class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
         """
         获取角色列表（支持搜索）
         """
-        query = db.query(Role).options(joinedload(Role.permissions))
+        statement = self.search_statement(keyword=keyword)
 
-        # 关键词搜索
-        if keyword:
-            search_filter = or_(
-                Role.name.ilike(f"%{keyword}%"),
-                Role.description.ilike(f"%{keyword}%")
-            )
-            query = query.filter(search_filter)
-
-        # 获取总数
-        total = query.count()
+        # 分页，权限一次性预加载；总数按 COUNT_STRATEGY 统计
+        page = self.get_page(
+            db, statement.options(selectinload(Role.permissions)), PageParams(skip=skip, limit=limit)
+        )
 
-        # 分页
-        roles = query.offset(skip).limit(limit).all()
+        return page.items, page.total
 
-        return roles, total
+    async def get_multi_with_search_async(
+        self,
+        db: AsyncSession,
+        *,
+        page: PageParams,
+        keyword: Optional[str] = None
+    ) -> Page[Role]:
+        """
+        获取角色列表（支持搜索和游标分页，异步）
+        """
+        statement = self.search_statement(keyword=keyword)
+        return await self.get_page_async(db, statement.options(selectinload(Role.permissions)), page)
 
     def get_statistics(self, db: Session) -> Dict[str, Any]:
         """
@@ -1,9 +1,12 @@
 from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import Select, func, select
+from app.core.search import keyword_filter
 from app.crud.base import CRUDBase
 from app.models.system_config import SystemConfig
 from app.schemas.system_config import SystemConfigCreate, SystemConfigUpdate
+from app.utils.pagination import Page, PageParams
 import json
 
 
@@ -81,45 +84,67 @@ class CRUDSystemConfig(CRUDBase[SystemConfig, SystemConfigCreate, SystemConfigUp
             return True
         return False
 
-    def get_multi_with_search(
+    def search_statement(
         self,
-        db: Session,
         *,
-        skip: int = 0,
-        limit: int = 100,
         keyword: Optional[str] = None,
         data_type: Optional[str] = None,
         is_active: Optional[bool] = None
-    ) -> Tuple[List[SystemConfig], int]:
+    ) -> Select:
         """
-        获取系统配置列表（支持搜索和筛选）
+        系统配置搜索和筛选的查询语句（按 ID 排序，不含分页）
         """
-        query = db.query(SystemConfig)
+        statement = select(SystemConfig)
 
-        # 关键词搜索
+        # 关键词搜索（配置键、配置值、描述），使用全文索引
         if keyword:
-            search_filter = or_(
-                SystemConfig.key.ilike(f"%{keyword}%"),
-                SystemConfig.value.ilike(f"%{keyword}%"),
-                SystemConfig.description.ilike(f"%{keyword}%")
-            )
-            query = query.filter(search_filter)
+            statement = statement.where(keyword_filter(SystemConfig, keyword))
 
         # 数据类型筛选
         if data_type:
-            query = query.filter(SystemConfig.data_type == data_type)
+            statement = statement.where(SystemConfig.data_type == data_type)
 
         # 状态筛选
         if is_active is not None:
-            query = query.filter(SystemConfig.is_active == is_active)
+            statement = statement.where(SystemConfig.is_active == is_active)
 
-        # 获取总数
-        total = query.count()
+        # 按创建顺序分页，与 (data_type, is_active, id) 索引一致
+        return statement.order_by(SystemConfig.id)
 
-        # 分页
-        configs = query.offset(skip).limit(limit).all()
+    def get_multi_with_search(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        keyword: Optional[str] = None,
+        data_type: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> Tuple[List[SystemConfig], int]:
+        """
+        获取系统配置列表（支持搜索和筛选）
+        """
+        statement = self.search_statement(keyword=keyword, data_type=data_type, is_active=is_active)
+
+        # 分页；总数按 COUNT_STRATEGY 统计
+        page = self.get_page(db, statement, PageParams(skip=skip, limit=limit))
+
+        return page.items, page.total
 
-        return configs, total
+    async def get_multi_with_search_async(
+        self,
+        db: AsyncSession,
+        *,
+        page: PageParams,
+        keyword: Optional[str] = None,
+        data_type: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> Page[SystemConfig]:
+        """
+        获取系统配置列表（支持搜索、筛选和游标分页，异步）
+        """
+        statement = self.search_statement(keyword=keyword, data_type=data_type, is_active=is_active)
+        return await self.get_page_async(db, statement, page)
 
     def get_statistics(self, db: Session) -> Dict[str, Any]:
         """
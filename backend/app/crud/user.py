@@ -1,16 +1,30 @@
 """
 用户 CRUD 操作
 """
-from typing import Any, Dict, Optional, Union, List, Tuple
+from typing import Any, Dict, Optional, Sequence, Union, List, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Select, bindparam, delete, func, insert, select, update
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
-from app.models.user import User
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    get_password_hashes,
+    verify_password,
+    verify_password_async,
+)
+from app.core.search import keyword_filter
+from app.crud.base import CRUDBase, chunked
+from app.models.user import User, user_role_association
 from app.models.role import Role
-from app.schemas.user import UserCreate, UserUpdate, UserPreferences
+from app.utils.pagination import Page, PageParams
+from app.schemas.bulk import BulkResult
+from app.schemas.user import UserBulkUpdate, UserCreate, UserUpdate, UserPreferences
+from app.services.permission_cache import permission_cache
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -24,28 +38,39 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """根据用户名获取用户"""
         return db.query(User).filter(User.username == username).first()
     
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
-        """创建用户"""
+    def create(self, db: Session, *, obj_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """
+        创建用户
+
+        不预先查询用户名和邮箱是否已存在，由唯一约束保证。插入在保存点中执行，违反约束时只撤销这次插入
+        并抛出 IntegrityError，可用 unique_violation 识别冲突的列，是否回滚整个事务由调用方（或 get_db）决定。
+        角色用一条 IN 查询校验，用户和用户角色关联在同一次刷新中写入
+
+        Args:
+            hashed_password: 已计算好的密码哈希（见 create_async），为空时在当前线程中计算
+        """
         db_obj = User(
             email=obj_in.email,
             username=obj_in.username,
             full_name=obj_in.full_name,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password or get_password_hash(obj_in.password),
             is_active=obj_in.is_active,
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-
-        # 分配角色
-        if obj_in.role_ids:
-            roles = db.query(Role).filter(Role.id.in_(obj_in.role_ids)).all()
-            db_obj.roles = roles
-            db.commit()
-            db.refresh(db_obj)
 
+        # begin_nested 先刷新会话中已有的修改，保存点只包含这次插入
+        with db.begin_nested():
+            # 先加入会话再分配角色，角色一侧的反向关系才能随用户一起级联
+            db.add(db_obj)
+            # 分配角色（新对象的角色集合无需加载），不存在的角色ID被忽略
+            if obj_in.role_ids:
+                db_obj.roles = db.scalars(select(Role).where(Role.id.in_(obj_in.role_ids))).all()
         return db_obj
     
+    async def create_async(self, db: Session, *, obj_in: UserCreate) -> User:
+        """创建用户（密码哈希在密码哈希线程池中计算，不占用请求线程；数据库操作在线程池中执行）"""
+        hashed_password = await get_password_hash_async(obj_in.password)
+        return await run_in_threadpool(self.create, db, obj_in=obj_in, hashed_password=hashed_password)
+
     def update(
         self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
     ) -> User:
@@ -64,29 +89,139 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
 
+        # 用户名、激活状态和角色都缓存在认证主体中
+        permission_cache.invalidate_user(db, db_obj.id)
+
         # 更新基本信息
         updated_user = super().update(db, db_obj=db_obj, obj_in=update_data)
 
-        # 更新角色
+        # 更新角色（替换集合前先预加载原有角色，避免延迟加载）
         if role_ids is not None:
-            roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
-            updated_user.roles = roles
-            db.commit()
-            db.refresh(updated_user)
+            updated_user = self.reload_with_roles(db, id=updated_user.id)
+            updated_user.roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
+            db.flush()
 
         return updated_user
     
+    async def update_async(
+        self, db: Session, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        """更新用户（新密码的哈希在密码哈希线程池中计算，不占用请求线程；数据库操作在线程池中执行）"""
+        update_data = dict(obj_in) if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        if "password" in update_data:
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
+        return await run_in_threadpool(self.update, db, db_obj=db_obj, obj_in=update_data)
+
+    def remove(self, db: Session, *, id: int) -> Optional[User]:
+        """删除用户（用户角色关联由基类直接删除）"""
+        permission_cache.invalidate_user(db, id)
+        return super().remove(db, id=id)
+
+    def create_many(self, db: Session, *, objs_in: Sequence[UserCreate]) -> BulkResult:
+        """
+        批量创建用户
+
+        密码哈希在密码哈希线程池中并行计算，用户分块插入，角色关联用一条 executemany 写入
+        """
+        hashes = get_password_hashes(obj_in.password for obj_in in objs_in)
+        rows = [
+            {
+                "email": obj_in.email,
+                "username": obj_in.username,
+                "full_name": obj_in.full_name,
+                "hashed_password": hashed_password,
+                "is_active": obj_in.is_active,
+            }
+            for obj_in, hashed_password in zip(objs_in, hashes)
+        ]
+        result = self._insert_many(db, rows)
+        self._assign_roles(db, {
+            item.id: objs_in[item.index].role_ids
+            for item in result.succeeded if objs_in[item.index].role_ids
+        })
+        return result
+
+    def update_many(self, db: Session, *, objs_in: Sequence[UserBulkUpdate]) -> BulkResult:
+        """批量更新用户（密码并行哈希，提供 role_ids 时替换角色）"""
+        entries = [obj_in.model_dump(exclude_unset=True) for obj_in in objs_in]
+        with_password = [entry for entry in entries if entry.get("password")]
+        hashes = get_password_hashes(entry["password"] for entry in with_password)
+        for entry, hashed_password in zip(with_password, hashes):
+            entry["hashed_password"] = hashed_password
+
+        result = self._update_many(db, [(entry["id"], self.column_values(entry)) for entry in entries])
+        # 用户名、激活状态和角色都缓存在认证主体中
+        permission_cache.invalidate_users(db, [item.id for item in result.succeeded])
+        self._assign_roles(db, {
+            item.id: entries[item.index]["role_ids"]
+            for item in result.succeeded if entries[item.index].get("role_ids") is not None
+        }, replace=True)
+        return result
+
+    def remove_many(
+        self, db: Session, *, ids: Sequence[int], rejected: Optional[Dict[int, str]] = None
+    ) -> BulkResult:
+        """批量删除用户"""
+        permission_cache.invalidate_users(db, ids)
+        return super().remove_many(db, ids=ids, rejected=rejected)
+
+    def _assign_roles(self, db: Session, user_roles: Dict[int, List[int]], *, replace: bool = False) -> None:
+        """
+        批量写入用户角色关联，不存在的角色会被忽略
+
+        Args:
+            user_roles: 用户ID -> 角色ID列表
+            replace: 是否先删除用户原有的角色
+        """
+        if not user_roles:
+            return
+        role_ids = {role_id for ids in user_roles.values() for role_id in ids}
+        valid = set(db.scalars(select(Role.id).where(Role.id.in_(role_ids)))) if role_ids else set()
+        if replace:
+            for chunk in chunked(list(user_roles), settings.BULK_CHUNK_SIZE):
+                db.execute(delete(user_role_association).where(user_role_association.c.user_id.in_(chunk)))
+        rows = [
+            {"user_id": user_id, "role_id": role_id}
+            for user_id, ids in user_roles.items()
+            for role_id in dict.fromkeys(ids) if role_id in valid
+        ]
+        if rows:
+            db.execute(insert(user_role_association), rows)
+
+    def reload_with_roles(self, db: Session, *, id: int) -> Optional[User]:
+        """获取用户并预加载角色，会话中已有的对象也会被刷新"""
+        return db.scalars(
+            select(User)
+            .options(selectinload(User.roles))
+            .where(User.id == id)
+            .execution_options(populate_existing=True)
+        ).first()
+    
+    def get_by_login(self, db: Session, *, login: str) -> Optional[User]:
+        """根据用户名或邮箱获取用户"""
+        user = self.get_by_username(db, username=login)
+        if not user:
+            user = self.get_by_email(db, email=login)
+        return user
+    
     def authenticate(self, db: Session, *, username: str, password: str) -> Optional[User]:
         """用户认证"""
-        user = self.get_by_username(db, username=username)
-        if not user:
-            user = self.get_by_email(db, email=username)
+        user = self.get_by_login(db, login=username)
         if not user:
             return None
         if not verify_password(password, user.hashed_password):
             return None
         return user
     
+    async def authenticate_async(self, db: Session, *, username: str, password: str) -> Optional[User]:
+        """用户认证（密码校验在密码哈希线程池中执行，不占用请求线程）"""
+        user = await run_in_threadpool(self.get_by_login, db, login=username)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+        return user
+    
     def is_active(self, user: User) -> bool:
         """检查用户是否激活"""
         return user.is_active
@@ -99,20 +234,37 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         ).filter(User.id == id).first()
 
     def update_login_info(self, db: Session, *, user: User, ip_address: str = None) -> User:
-        """更新用户登录信息"""
-        user.last_login_at = datetime.utcnow()
-        user.last_login_ip = ip_address
-        # 增加登录次数
-        try:
-            current_count = int(user.login_count or '0')
-            user.login_count = str(current_count + 1)
-        except ValueError:
-            user.login_count = '1'
-
-        db.commit()
+        """更新用户登录信息（登录次数在 SQL 中原子递增）"""
+        self.bulk_update_login_info(db, entries=[(user.id, datetime.utcnow(), ip_address, 1)])
         db.refresh(user)
         return user
 
+    def bulk_update_login_info(
+        self, db: Session, *, entries: List[Tuple[int, datetime, Optional[str], int]]
+    ) -> None:
+        """
+        批量更新登录信息，不提交事务
+
+        Args:
+            entries: (用户ID, 最后登录时间, 最后登录IP, 登录次数增量) 列表
+        """
+        if not entries:
+            return
+        table = User.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                last_login_at=bindparam("b_at"),
+                last_login_ip=bindparam("b_ip"),
+                login_count=table.c.login_count + bindparam("b_count"),
+            ),
+            [
+                {"b_id": user_id, "b_at": login_at, "b_ip": ip_address, "b_count": count}
+                for user_id, login_at, ip_address, count in entries
+            ]
+        )
+
     def update_preferences(self, db: Session, *, user: User, preferences: UserPreferences) -> User:
         """更新用户偏好设置"""
         if preferences.preferred_language is not None:
@@ -120,49 +272,72 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         if preferences.timezone is not None:
             user.timezone = preferences.timezone
 
-        db.commit()
-        db.refresh(user)
+        db.flush()
         return user
 
-    def get_multi_with_search(
+    def search_statement(
         self,
-        db: Session,
         *,
-        skip: int = 0,
-        limit: int = 100,
         keyword: Optional[str] = None,
         role_id: Optional[int] = None,
         is_active: Optional[bool] = None
-    ) -> Tuple[List[User], int]:
+    ) -> Select:
         """
-        获取用户列表（支持搜索和筛选）
+        用户搜索和筛选的查询语句（按 ID 排序，不含分页）
         """
-        query = db.query(User)
+        statement = select(User)
 
-        # 关键词搜索
+        # 关键词搜索（用户名、邮箱、姓名），使用全文索引
         if keyword:
-            search_filter = or_(
-                User.username.ilike(f"%{keyword}%"),
-                User.email.ilike(f"%{keyword}%"),
-                User.full_name.ilike(f"%{keyword}%")
-            )
-            query = query.filter(search_filter)
+            statement = statement.where(keyword_filter(User, keyword))
 
         # 角色筛选
         if role_id is not None:
-            query = query.join(User.roles).filter(Role.id == role_id)
+            statement = statement.join(User.roles).where(Role.id == role_id)
 
         # 状态筛选
         if is_active is not None:
-            query = query.filter(User.is_active == is_active)
+            statement = statement.where(User.is_active == is_active)
+
+        # 按创建顺序分页，与 (is_active, id) 索引一致
+        return statement.order_by(User.id)
+
+    def get_multi_with_search(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        keyword: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None
+    ) -> Tuple[List[User], int]:
+        """
+        获取用户列表（支持搜索和筛选）
+        """
+        statement = self.search_statement(keyword=keyword, role_id=role_id, is_active=is_active)
 
-        # 获取总数
-        total = query.count()
+        # 分页，角色一次性预加载；总数按 COUNT_STRATEGY 统计
+        page = self.get_page(
+            db, statement.options(selectinload(User.roles)), PageParams(skip=skip, limit=limit)
+        )
 
-        # 分页
-        users = query.offset(skip).limit(limit).all()
+        return page.items, page.total
 
-        return users, total
+    async def get_multi_with_search_async(
+        self,
+        db: AsyncSession,
+        *,
+        page: PageParams,
+        keyword: Optional[str] = None,
+        role_id: Optional[int] = None,
+        is_active: Optional[bool] = None
+    ) -> Page[User]:
+        """
+        获取用户列表（支持搜索、筛选和游标分页，异步）
+        """
+        statement = self.search_statement(keyword=keyword, role_id=role_id, is_active=is_active)
+        return await self.get_page_async(db, statement.options(selectinload(User.roles)), page)
 
     def get_statistics(self, db: Session) -> Dict[str, Any]:
         """
@@ -3,16 +3,22 @@ FastAPI Admin 主应用
 """
 from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 import json
 
-from app.api import auth, users, roles, permissions, system_configs, notification_clients
+from app.api import auth, users, roles, permissions, system_configs, notification_clients, monitoring
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import QueryProfile, current_query_profile
+from app.core.lazy_load import current_request_scope, lazy_load_detector
+from app.core.schema import ensure_schema
+from app.core.security import password_hasher
 from app.services.config_manager import config_manager
+from app.services.login_stats import login_stats
+from app.services.sql_profiler import sql_profiler
+from app.utils.pagination import InvalidCursorError
 
 
 
@@ -22,10 +28,15 @@ from app.services.config_manager import config_manager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时
+    # 检查数据库版本（只查询 alembic_version，建表由迁移或开发命令完成）
+    ensure_schema()
     await config_manager.start()
+    await login_stats.start()
     yield
     # 关闭时
+    await login_stats.stop()
     await config_manager.stop()
+    password_hasher.shutdown()
 
 # 创建 FastAPI 应用实例
 app = FastAPI(
@@ -43,8 +54,42 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Exact"],
     )
 
+# SQL 性能统计
+if settings.SQL_PROFILING_ENABLED:
+    @app.middleware("http")
+    async def profile_sql(request: Request, call_next):
+        """统计请求的 SQL 语句数和数据库耗时，记录在 request.state.sql_profile 中并按路由汇总"""
+        profile = QueryProfile()
+        request.state.sql_profile = profile
+        token = current_query_profile.set(profile)
+        try:
+            response = await call_next(request)
+        finally:
+            current_query_profile.reset(token)
+        route = request.scope.get("route")
+        if route is not None:
+            sql_profiler.record(f"{request.method} {route.path}", profile)
+        return response
+
+# 延迟加载检测，记录发生延迟加载的路由
+if lazy_load_detector.enabled:
+    @app.middleware("http")
+    async def track_lazy_loads(request: Request, call_next):
+        """为延迟加载检测提供当前请求的路由"""
+        token = current_request_scope.set(request.scope)
+        try:
+            return await call_next(request)
+        finally:
+            current_request_scope.reset(token)
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """游标令牌无效时返回 400"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
 # 注册路由
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
@@ -52,13 +97,7 @@ app.include_router(roles.router, prefix=f"{settings.API_V1_STR}/roles", tags=["r
 app.include_router(permissions.router, prefix=f"{settings.API_V1_STR}/permissions", tags=["permissions"])
 app.include_router(system_configs.router, prefix=f"{settings.API_V1_STR}/system-configs", tags=["system-configs"])
 app.include_router(notification_clients.router, prefix=f"{settings.API_V1_STR}/notification-clients", tags=["notification-clients"])
-
-
-@app.on_event("startup")
-async def startup_event():
-    """应用启动事件"""
-    # 创建数据库表
-    create_tables()
+app.include_router(monitoring.router, prefix=f"{settings.API_V1_STR}/monitoring", tags=["monitoring"])
 
 
 @app.get("/")
@@ -1,7 +1,7 @@
 """
 通知客户端数据模型
 """
-from sqlalchemy import Column, String, Text, Boolean, Integer
+from sqlalchemy import Column, String, Text, Boolean, Integer, Index
 from sqlalchemy.dialects.sqlite import JSON
 
 from .base import BaseModel
@@ -12,6 +12,13 @@ class NotificationClient(BaseModel):
     通知客户端模型
     """
     __tablename__ = "notification_clients"
+    __table_args__ = (
+        # 客户端列表按类型、启用状态筛选并按 ID 分页
+        Index('ix_notification_clients_type_enabled_id', 'type', 'enabled', 'id'),
+        Index('ix_notification_clients_enabled_id', 'enabled', 'id'),
+    )
+    # 关键词搜索的字段，由全文索引提供支持（见 app.core.search）
+    __search_fields__ = ("name", "type")
     
     name = Column(String(100), nullable=False, comment="客户端名称")
     type = Column(String(50), nullable=False, comment="通知类型")
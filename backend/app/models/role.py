@@ -1,7 +1,7 @@
 """
 角色数据模型
 """
-from sqlalchemy import Column, String, Text, Table, ForeignKey
+from sqlalchemy import Column, String, Text, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -12,7 +12,9 @@ role_permission_association = Table(
     'role_permissions',
     BaseModel.metadata,
     Column('role_id', ForeignKey('role.id'), primary_key=True),
-    Column('permission_id', ForeignKey('permission.id'), primary_key=True)
+    Column('permission_id', ForeignKey('permission.id'), primary_key=True),
+    # 主键为 (role_id, permission_id)，按权限查角色需要反向索引
+    Index('ix_role_permissions_permission_id_role_id', 'permission_id', 'role_id')
 )
 
 
@@ -21,6 +23,8 @@ class Role(BaseModel):
     角色模型
     """
     __tablename__ = "role"
+    # 关键词搜索的字段，由全文索引提供支持（见 app.core.search）
+    __search_fields__ = ("name", "description")
     
     name = Column(String(50), unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 
 class SystemConfig(Base):
     __tablename__ = "system_configs"
+    __table_args__ = (
+        # 配置列表按数据类型、状态筛选并按 ID 分页
+        Index('ix_system_configs_data_type_is_active_id', 'data_type', 'is_active', 'id'),
+        Index('ix_system_configs_is_active_id', 'is_active', 'id'),
+    )
+    # 关键词搜索的字段，由全文索引提供支持（见 app.core.search）
+    __search_fields__ = ("key", "value", "description")
 
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(255), unique=True, index=True, nullable=False, comment="配置键")
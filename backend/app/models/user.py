@@ -1,7 +1,7 @@
 """
 用户数据模型
 """
-from sqlalchemy import Column, String, Boolean, Table, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -13,7 +13,9 @@ user_role_association = Table(
     'user_roles',
     BaseModel.metadata,
     Column('user_id', ForeignKey('user.id'), primary_key=True),
-    Column('role_id', ForeignKey('role.id'), primary_key=True)
+    Column('role_id', ForeignKey('role.id'), primary_key=True),
+    # 主键为 (user_id, role_id)，按角色查用户需要反向索引
+    Index('ix_user_roles_role_id_user_id', 'role_id', 'user_id')
 )
 
 
@@ -22,6 +24,12 @@ class User(BaseModel):
     用户模型
     """
     __tablename__ = "user"
+    __table_args__ = (
+        # 用户列表按状态筛选并按 ID 分页
+        Index('ix_user_is_active_id', 'is_active', 'id'),
+    )
+    # 关键词搜索的字段，由全文索引提供支持（见 app.core.search）
+    __search_fields__ = ("username", "email", "full_name")
     
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
@@ -33,7 +41,7 @@ class User(BaseModel):
     timezone = Column(String(50), nullable=True)  # 用户时区
     last_login_at = Column(DateTime, nullable=True)  # 上次登录时间
     last_login_ip = Column(String(45), nullable=True)  # 上次登录IP
-    login_count = Column(String(10), default='0', nullable=False)  # 登录次数
+    login_count = Column(Integer, default=0, server_default='0', nullable=False)  # 登录次数
 
     # 关联角色
     roles = relationship(
@@ -1,11 +1,12 @@
 """
 Pydantic 模式模块
 """
-from .user import User, UserCreate, UserUpdate, UserWithRoles
-from .role import Role, RoleCreate, RoleUpdate, RoleWithPermissions
+from .user import User, UserCreate, UserUpdate, UserBulkUpdate, UserWithRoles
+from .role import Role, RoleCreate, RoleUpdate, RoleBulkUpdate, RoleWithPermissions
 from .permission import Permission, PermissionCreate, PermissionUpdate
 from .auth import Token, TokenPayload, LoginRequest, LoginResponse
 from .system_config import SystemConfig, SystemConfigCreate, SystemConfigUpdate, SystemConfigInDB
+from .bulk import BulkItems, BulkDelete, BulkItemResult, BulkResult
 from .notification_client import (
     NotificationClient, NotificationClientCreate, NotificationClientUpdate,
     NotificationTypeConfig, NotificationScenario, NotificationTestRequest,
@@ -13,11 +14,12 @@ from .notification_client import (
 )
 
 __all__ = [
-    "User", "UserCreate", "UserUpdate", "UserWithRoles",
-    "Role", "RoleCreate", "RoleUpdate", "RoleWithPermissions",
+    "User", "UserCreate", "UserUpdate", "UserBulkUpdate", "UserWithRoles",
+    "Role", "RoleCreate", "RoleUpdate", "RoleBulkUpdate", "RoleWithPermissions",
     "Permission", "PermissionCreate", "PermissionUpdate",
     "Token", "TokenPayload", "LoginRequest", "LoginResponse",
     "SystemConfig", "SystemConfigCreate", "SystemConfigUpdate", "SystemConfigInDB",
+    "BulkItems", "BulkDelete", "BulkItemResult", "BulkResult",
     "NotificationClient", "NotificationClientCreate", "NotificationClientUpdate",
     "NotificationTypeConfig", "NotificationScenario", "NotificationTestRequest",
     "NotificationTestResponse", "NotificationSendRequest", "NotificationSendResponse"
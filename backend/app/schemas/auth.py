@@ -1,7 +1,7 @@
 """
 认证相关的 Pydantic 模式
 """
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -14,6 +14,10 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     """令牌载荷模式"""
     sub: Optional[str] = None
+    name: Optional[str] = None  # 用户名
+    act: Optional[bool] = None  # 用户是否激活
+    rls: Optional[List[int]] = None  # 角色ID列表
+    pv: Optional[str] = None  # 鉴权状态版本号
 
 
 class LoginRequest(BaseModel):
@@ -0,0 +1,32 @@
+"""
+批量操作相关的 Pydantic 模式
+"""
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class BulkItems(BaseModel, Generic[T]):
+    """批量创建/更新请求"""
+    items: List[T] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkDelete(BaseModel):
+    """批量删除请求"""
+    ids: List[int] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class BulkItemResult(BaseModel):
+    """单个条目的处理结果"""
+    index: int  # 条目在请求中的序号
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    """批量操作结果，失败的条目不影响其他条目"""
+    succeeded: List[BulkItemResult] = []
+    failed: List[BulkItemResult] = []
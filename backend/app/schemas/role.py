@@ -25,6 +25,11 @@ class RoleUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class RoleBulkUpdate(RoleUpdate):
+    """批量更新角色模式"""
+    id: int
+
+
 class RoleInDBBase(RoleBase):
     """数据库中的角色基础模式"""
     id: int
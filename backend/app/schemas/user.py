@@ -34,6 +34,11 @@ class UserUpdate(BaseModel):
     role_ids: Optional[List[int]] = None
 
 
+class UserBulkUpdate(UserUpdate):
+    """批量更新用户模式"""
+    id: int
+
+
 class UserInDBBase(UserBase):
     """数据库中的用户基础模式"""
     id: int
@@ -41,7 +46,7 @@ class UserInDBBase(UserBase):
     updated_at: datetime
     last_login_at: Optional[datetime] = None
     last_login_ip: Optional[str] = None
-    login_count: Optional[str] = '0'
+    login_count: Optional[int] = 0
 
     class Config:
         from_attributes = True
@@ -0,0 +1,151 @@
+"""
+登录统计写回服务
+登录时间、IP 和登录次数先在内存中合并，按时间间隔或数量阈值批量写入数据库
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.user import user as crud_user
+
+logger = logging.getLogger(__name__)
+
+
+class LoginStatsRecorder:
+    """登录统计记录器"""
+
+    def __init__(self, flush_interval: float = 5, flush_size: int = 500):
+        """
+        初始化登录统计记录器
+
+        Args:
+            flush_interval: 写回间隔(秒)
+            flush_size: 待写回用户数达到该值时立即写回
+        """
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        # 用户ID -> [最后登录时间, 最后登录IP, 登录次数增量]
+        self._pending: Dict[int, list] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._running = False
+
+    async def start(self):
+        """启动写回任务"""
+        if self._running:
+            return
+
+        self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Login stats recorder started with flush interval: {self.flush_interval}s")
+
+    async def stop(self):
+        """停止写回任务，并写回剩余的统计"""
+        if not self._running:
+            return
+
+        self._running = False
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.flush)
+        logger.info("Login stats recorder stopped")
+
+    def record(self, user_id: int, ip_address: Optional[str] = None, login_at: Optional[datetime] = None) -> None:
+        """
+        记录一次登录（只写入内存缓冲，不访问数据库，可在事件循环中直接调用）
+
+        写回任务未启动时（例如脚本中使用）统计保留在缓冲区，由调用方调用 flush() 写回
+        """
+        login_at = login_at or datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(user_id)
+            if entry is None:
+                self._pending[user_id] = [login_at, ip_address, 1]
+            else:
+                entry[0], entry[1] = login_at, ip_address
+                entry[2] += 1
+            size = len(self._pending)
+
+        if self._running and size >= self.flush_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def pending_count(self, user_id: int) -> int:
+        """获取用户尚未写回的登录次数"""
+        with self._lock:
+            entry = self._pending.get(user_id)
+            return entry[2] if entry else 0
+
+    def flush(self) -> int:
+        """将缓冲的统计批量写入数据库，返回写入的用户数"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            entries: List[Tuple[int, datetime, Optional[str], int]] = [
+                (user_id, login_at, ip_address, count)
+                for user_id, (login_at, ip_address, count) in pending.items()
+            ]
+            db = SessionLocal()
+            try:
+                crud_user.bulk_update_login_info(db, entries=entries)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._requeue(pending)
+                logger.error(f"Error flushing login stats: {e}")
+                return 0
+            finally:
+                db.close()
+            return len(entries)
+
+    async def _flush_loop(self):
+        """写回循环"""
+        while self._running:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await asyncio.to_thread(self.flush)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in login stats flush loop: {e}")
+
+    def _requeue(self, pending: Dict[int, list]) -> None:
+        """写回失败时将统计合并回缓冲区，较新的登录记录优先"""
+        with self._lock:
+            for user_id, (login_at, ip_address, count) in pending.items():
+                entry = self._pending.get(user_id)
+                if entry is None:
+                    self._pending[user_id] = [login_at, ip_address, count]
+                else:
+                    entry[2] += count
+
+    @property
+    def is_running(self) -> bool:
+        """检查写回任务是否运行中"""
+        return self._running
+
+
+# 全局登录统计记录器
+login_stats = LoginStatsRecorder(
+    flush_interval=settings.LOGIN_STATS_FLUSH_INTERVAL,
+    flush_size=settings.LOGIN_STATS_FLUSH_SIZE,
+)
@@ -0,0 +1,377 @@
+"""
+用户权限缓存服务
+权限以位图表示：每个权限按主键 ID 占用一个固定的位，角色预先计算权限位掩码，
+用户的有效权限为其所有角色掩码的按位或，鉴权只需一次按位与运算。
+认证主体(Principal)按用户缓存，命中时鉴权不产生 SQL
+"""
+import itertools
+import secrets
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.permission import Permission
+from app.models.role import role_permission_association
+from app.models.user import User, user_role_association
+
+# 会话中待提交后失效的对象，结构为 {"users": set, "roles": set, "codes": bool}
+_PENDING_KEY = "permission_cache_pending"
+
+
+def permission_bit(permission_id: int) -> int:
+    """
+    权限对应的位（位索引即权限ID）
+
+    主键可能被复用（SQLite 未使用 AUTOINCREMENT 的表会重新分配已删除的最大ID），
+    因此位只在一次索引构建内有效：权限的新增、删除或代码变化都会清空整个索引和所有认证主体（invalidate_permission）
+    """
+    return 1 << permission_id
+
+
+class PermissionIndex:
+    """权限位图索引：权限代码 -> 位，角色 -> 权限位掩码"""
+
+    def __init__(self, ttl: int = 300):
+        """
+        初始化权限位图索引
+
+        Args:
+            ttl: 索引整体有效期(秒)，过期后全量重建
+        """
+        self.ttl = ttl
+        # (权限代码 -> 位, 角色ID -> 掩码)，作为整体替换以保证读取一致
+        # 掩码为 None 表示该角色已失效、需要重建；不存在的角色视为没有权限
+        self._state: Optional[Tuple[Dict[str, int], Dict[int, Optional[int]]]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def bit_for(self, db: Session, code: str) -> int:
+        """获取权限代码对应的位，未知代码返回 0"""
+        code_bits, _ = self._snapshot(db)
+        return code_bits.get(code, 0)
+
+    def role_mask(self, db: Session, role_id: int) -> int:
+        """获取角色的权限位掩码"""
+        _, role_masks = self._snapshot(db)
+        mask = role_masks.get(role_id, 0)
+        if mask is None:
+            mask = self._rebuild_role(db, role_id)
+        return mask
+
+    def mask_for_roles(self, db: Session, role_ids: Iterable[int]) -> int:
+        """计算多个角色的合并权限位掩码"""
+        mask = 0
+        for role_id in role_ids:
+            mask |= self.role_mask(db, role_id)
+        return mask
+
+    def codes_for_mask(self, db: Session, mask: int) -> FrozenSet[str]:
+        """将权限位掩码还原为权限代码集合"""
+        code_bits, _ = self._snapshot(db)
+        return frozenset(code for code, bit in code_bits.items() if mask & bit)
+
+    def reload(self, db: Session) -> Tuple[Dict[str, int], Dict[int, Optional[int]]]:
+        """全量重建索引：一条查询加载权限，一条查询加载角色权限关联"""
+        with self._lock:
+            generation = self._generation
+        code_bits = {
+            code: permission_bit(permission_id)
+            for permission_id, code in db.execute(select(Permission.id, Permission.code))
+        }
+        role_masks: Dict[int, Optional[int]] = {}
+        for role_id, permission_id in db.execute(
+            select(role_permission_association.c.role_id, role_permission_association.c.permission_id)
+        ):
+            role_masks[role_id] = role_masks.get(role_id, 0) | permission_bit(permission_id)
+        with self._lock:
+            if generation == self._generation:
+                self._state = (code_bits, role_masks)
+                self._expires_at = time.monotonic() + self.ttl
+        return code_bits, role_masks
+
+    def invalidate_role(self, role_id: int) -> None:
+        """角色权限变化后丢弃其掩码，下次使用时重建"""
+        with self._lock:
+            self._generation += 1
+            if self._state is not None:
+                self._state[1][role_id] = None
+
+    def invalidate_codes(self) -> None:
+        """权限新增、删除或代码变化后丢弃整个索引"""
+        with self._lock:
+            self._generation += 1
+            self._state = None
+
+    def peek(self) -> Optional[Tuple[Dict[str, int], Dict[int, Optional[int]]]]:
+        """不访问数据库获取当前索引，未加载或已过期时返回 None"""
+        state = self._state
+        if state is None or time.monotonic() >= self._expires_at:
+            return None
+        return state
+
+    def _snapshot(self, db: Session) -> Tuple[Dict[str, int], Dict[int, Optional[int]]]:
+        state = self._state
+        if state is None or time.monotonic() >= self._expires_at:
+            state = self.reload(db)
+        return state
+
+    def _rebuild_role(self, db: Session, role_id: int) -> int:
+        with self._lock:
+            generation = self._generation
+        mask = 0
+        for permission_id in db.execute(
+            select(role_permission_association.c.permission_id)
+            .where(role_permission_association.c.role_id == role_id)
+        ).scalars():
+            mask |= permission_bit(permission_id)
+        with self._lock:
+            if generation == self._generation and self._state is not None:
+                self._state[1][role_id] = mask
+        return mask
+
+
+class Principal:
+    """
+    认证主体
+
+    不关联 ORM 会话的不可变对象，供只需要身份和权限、不需要用户行的接口使用
+    """
+    __slots__ = ("id", "username", "is_active", "role_ids", "permission_mask", "permissions")
+
+    def __init__(
+        self,
+        id: int,
+        username: str,
+        is_active: bool,
+        role_ids: Tuple[int, ...],
+        permission_mask: int,
+        permissions: FrozenSet[str],
+    ):
+        for name, value in zip(self.__slots__, (id, username, is_active, role_ids, permission_mask, permissions)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Principal is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Principal is immutable")
+
+    def has_permission(self, code: str) -> bool:
+        """检查是否拥有指定权限"""
+        return code in self.permissions
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, username='{self.username}')>"
+
+
+class PermissionCache:
+    """认证主体缓存：用户ID -> Principal，权限位掩码由位图索引计算"""
+
+    def __init__(self, ttl: int = 300):
+        """
+        初始化权限缓存
+
+        Args:
+            ttl: 缓存条目有效期(秒)，用于限制多进程部署下的陈旧时间
+        """
+        self.ttl = ttl
+        self.index = PermissionIndex(ttl=ttl)
+        self._entries: Dict[int, Tuple[Principal, float]] = {}
+        # 用户ID -> (鉴权版本号, 过期时间)，版本号带进程标识，其他进程或重启前签发的令牌不会匹配
+        self._versions: Dict[int, Tuple[str, float]] = {}
+        self._process_id = secrets.token_hex(4)
+        self._version_counter = itertools.count(1)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_principal(self, db: Session, user_id: int) -> Optional[Principal]:
+        """
+        获取认证主体，用户不存在时返回 None
+
+        未命中时用一条 SQL 同时加载用户和角色，权限来自内存中的位图索引
+        """
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        with self._lock:
+            generation = self._generation
+        rows = db.execute(
+            select(User.id, User.username, User.is_active, user_role_association.c.role_id)
+            .outerjoin(user_role_association, user_role_association.c.user_id == User.id)
+            .where(User.id == user_id)
+        ).all()
+        if not rows:
+            return None
+
+        role_ids = tuple(sorted(row.role_id for row in rows if row.role_id is not None))
+        mask = self.index.mask_for_roles(db, role_ids)
+        principal = Principal(
+            id=rows[0].id,
+            username=rows[0].username,
+            is_active=bool(rows[0].is_active),
+            role_ids=role_ids,
+            permission_mask=mask,
+            permissions=self.index.codes_for_mask(db, mask),
+        )
+        with self._lock:
+            # 加载期间发生过失效则不写入，避免缓存旧数据
+            if generation == self._generation:
+                self._entries[user_id] = (principal, now + self.ttl)
+        return principal
+
+    def claims_version(self, user_id: int) -> str:
+        """
+        获取用户当前的鉴权版本号
+
+        用户信息、角色或权限变化时版本号失效，之后生成新的版本号。
+        其他工作进程中的变化不会使本进程的版本号失效，因此版本号与认证主体一样在 ttl 后过期
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is None or entry[1] <= now:
+                entry = (f"{self._process_id}.{next(self._version_counter)}", now + self.ttl)
+                self._versions[user_id] = entry
+            return entry[0]
+
+    def token_claims(self, db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        生成嵌入访问令牌的鉴权声明
+
+        先取版本号再加载认证主体，加载期间版本号失效时不生成声明，避免旧状态带上新版本号
+        """
+        version = self.claims_version(user_id)
+        principal = self.get_principal(db, user_id)
+        entry = self._versions.get(user_id)
+        if principal is None or entry is None or entry[0] != version:
+            return None
+        return {
+            "name": principal.username,
+            "act": principal.is_active,
+            "rls": list(principal.role_ids),
+            "pv": version,
+        }
+
+    def principal_from_claims(
+        self, user_id: int, username: str, is_active: bool, role_ids: Iterable[int], version: str
+    ) -> Optional[Principal]:
+        """
+        根据令牌中的鉴权声明构造认证主体，不访问数据库
+
+        版本号与本进程当前版本一致且位图索引已加载时，权限由声明中的角色和索引中的角色掩码计算；
+        否则返回 None，由调用方走数据库路径
+        """
+        entry = self._versions.get(user_id)
+        if entry is None or entry[0] != version or entry[1] <= time.monotonic():
+            return None
+        state = self.index.peek()
+        if state is None:
+            return None
+        code_bits, role_masks = state
+        role_ids = tuple(role_ids)
+        mask = 0
+        for role_id in role_ids:
+            role_mask = role_masks.get(role_id, 0)
+            if role_mask is None:
+                # 角色掩码等待重建
+                return None
+            mask |= role_mask
+        return Principal(
+            id=user_id,
+            username=username,
+            is_active=is_active,
+            role_ids=role_ids,
+            permission_mask=mask,
+            permissions=frozenset(code for code, bit in code_bits.items() if mask & bit),
+        )
+
+    def has_permission(self, db: Session, principal: Principal, code: str) -> bool:
+        """检查认证主体是否拥有指定权限（一次按位与）"""
+        bit = self.index.bit_for(db, code)
+        return bool(bit) and bool(principal.permission_mask & bit)
+
+    def invalidate_user(self, db: Session, user_id: int) -> None:
+        """用户信息、角色变化或删除后使其缓存失效"""
+        self.invalidate_users(db, [user_id])
+
+    def invalidate_users(self, db: Session, user_ids: Iterable[int]) -> None:
+        """
+        使多个用户的缓存失效
+
+        立即失效一次，并在会话提交后再次失效，防止并发请求在提交前读到旧数据并回填缓存
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        self._evict(user_ids)
+        self._pending(db)["users"].update(user_ids)
+
+    def invalidate_role(self, db: Session, role_id: int) -> None:
+        """角色权限变化后重建其权限掩码，并使拥有该角色的用户失效"""
+        self.invalidate_roles(db, [role_id])
+
+    def invalidate_roles(self, db: Session, role_ids: Iterable[int]) -> None:
+        """使多个角色失效，拥有这些角色的用户用一条查询取出"""
+        role_ids = set(role_ids)
+        if not role_ids:
+            return
+        for role_id in role_ids:
+            self.index.invalidate_role(role_id)
+        self._pending(db)["roles"].update(role_ids)
+        user_ids = db.execute(
+            select(user_role_association.c.user_id)
+            .where(user_role_association.c.role_id.in_(role_ids))
+        ).scalars().all()
+        self.invalidate_users(db, user_ids)
+
+    def invalidate_permission(self, db: Session, permission_id: int) -> None:
+        """权限新增、删除或代码变化后重建位图索引，并清空所有认证主体"""
+        self.clear()
+        self._pending(db)["codes"] = True
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._versions.clear()
+        self.index.invalidate_codes()
+
+    def _pending(self, db: Session) -> dict:
+        return db.info.setdefault(_PENDING_KEY, {"users": set(), "roles": set(), "codes": False})
+
+    def _evict(self, user_ids: Set[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                self._versions.pop(user_id, None)
+
+    def _apply_pending(self, pending: dict) -> None:
+        if pending["users"]:
+            self._evict(pending["users"])
+        if pending["codes"]:
+            self.clear()
+        else:
+            for role_id in pending["roles"]:
+                self.index.invalidate_role(role_id)
+
+
+# 全局权限缓存实例
+permission_cache = PermissionCache(ttl=settings.PERMISSION_CACHE_TTL)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _flush_pending_invalidations(session: Session, *args) -> None:
+    """会话结束事务后，再次失效本事务中涉及的用户、角色和权限"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        permission_cache._apply_pending(pending)
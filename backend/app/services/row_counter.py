@@ -0,0 +1,141 @@
+"""
+列表总数统计服务
+小结果精确统计；大结果使用查询规划器的估算行数（PostgreSQL）或短期缓存的精确总数，
+避免每次翻页都对整个筛选结果执行 COUNT
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+def count_statement(statement: Select) -> Select:
+    """根据查询语句生成统计总数的语句"""
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def bounded_count_statement(statement: Select, limit: int) -> Select:
+    """最多统计 limit 行的语句，超过阈值的结果只需扫描 limit 行即可判断"""
+    return select(func.count()).select_from(statement.order_by(None).limit(limit).subquery())
+
+
+class RowCounter:
+    """列表总数统计器"""
+
+    STRATEGIES = ("exact", "auto", "window")
+
+    def __init__(
+        self,
+        strategy: str = "auto",
+        threshold: int = 1000,
+        ttl: float = 60,
+        max_entries: int = 1000
+    ):
+        """
+        初始化列表总数统计器
+
+        Args:
+            strategy: exact: 总是执行 COUNT；auto: 结果不超过阈值时精确统计，否则估算或使用缓存；
+                      window: 在分页查询中用 count(*) over () 同时取得总数
+            threshold: 精确统计的行数上限
+            ttl: 大结果总数缓存有效期(秒)
+            max_entries: 缓存条目数上限
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported COUNT_STRATEGY: {strategy}")
+        self.strategy = strategy
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 查询语句 -> (总数, 过期时间)
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def window(self) -> bool:
+        """是否使用窗口函数在分页查询中统计总数"""
+        return self.strategy == "window"
+
+    def count(self, db: Session, statement: Select) -> Tuple[int, bool]:
+        """
+        统计查询结果总数
+
+        Returns:
+            (总数, 是否精确)
+        """
+        if self.strategy != "auto":
+            return db.scalar(count_statement(statement)), True
+
+        # 小结果：有界统计即为精确总数
+        bounded = db.scalar(bounded_count_statement(statement, self.threshold + 1))
+        if bounded <= self.threshold:
+            return bounded, True
+
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql":
+            estimate = self._planner_estimate(db, statement)
+            if estimate is not None:
+                return max(estimate, bounded), False
+
+        key = self._cache_key(bind, statement)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached, False
+        total = db.scalar(count_statement(statement))
+        self._store(key, total)
+        return total, True
+
+    def clear(self) -> None:
+        """清空总数缓存"""
+        with self._lock:
+            self._cache.clear()
+
+    def _planner_estimate(self, db: Session, statement: Select) -> Optional[int]:
+        """PostgreSQL 查询规划器估算的行数"""
+        sql = statement.order_by(None).compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        try:
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _cache_key(self, bind, statement: Select) -> Tuple[str, str]:
+        compiled = statement.order_by(None).compile(dialect=bind.dialect)
+        return str(compiled), repr(sorted(compiled.params.items()))
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key: Tuple[str, str], total: int) -> None:
+        with self._lock:
+            self._cache[key] = (total, time.monotonic() + self.ttl)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+
+# 全局列表总数统计实例
+row_counter = RowCounter(
+    strategy=settings.COUNT_STRATEGY,
+    threshold=settings.EXACT_COUNT_THRESHOLD,
+    ttl=settings.COUNT_CACHE_TTL,
+    max_entries=settings.COUNT_CACHE_SIZE,
+)
@@ -0,0 +1,76 @@
+"""
+SQL 性能统计服务
+按路由汇总每个请求的 SQL 语句数和数据库耗时，用于发现接口的查询回归
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.database import QueryProfile
+
+
+def _percentiles(samples: List[float]) -> Tuple[float, float, float]:
+    """计算 p50、p95 和最大值"""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return (
+        ordered[min(last, int(len(ordered) * 0.5))],
+        ordered[min(last, int(len(ordered) * 0.95))],
+        ordered[-1],
+    )
+
+
+class SQLProfiler:
+    """路由 SQL 统计器"""
+
+    def __init__(self, max_samples: int = 1000):
+        """
+        初始化路由 SQL 统计器
+
+        Args:
+            max_samples: 每个路由保留的最近请求样本数
+        """
+        self.max_samples = max_samples
+        # 路由 -> [请求总数, (语句数, 数据库耗时毫秒) 样本]
+        self._routes: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, profile: QueryProfile) -> None:
+        """记录一个请求的 SQL 统计"""
+        sample = (profile.statement_count, profile.db_time * 1000)
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = [0, deque(maxlen=self.max_samples)]
+            entry[0] += 1
+            entry[1].append(sample)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各路由的语句数和数据库耗时分位数"""
+        with self._lock:
+            snapshot = {route: (count, list(samples)) for route, (count, samples) in self._routes.items()}
+
+        result = {}
+        for route, (count, samples) in sorted(snapshot.items()):
+            query_p50, query_p95, query_max = _percentiles([s[0] for s in samples])
+            time_p50, time_p95, time_max = _percentiles([s[1] for s in samples])
+            result[route] = {
+                "requests": count,
+                "query_count": {"p50": query_p50, "p95": query_p95, "max": query_max},
+                "db_time": {
+                    "p50_ms": round(time_p50, 3),
+                    "p95_ms": round(time_p95, 3),
+                    "max_ms": round(time_max, 3),
+                },
+            }
+        return result
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._routes.clear()
+
+
+# 全局路由 SQL 统计实例
+sql_profiler = SQLProfiler(max_samples=settings.SQL_PROFILE_SAMPLES)
@@ -1,9 +1,25 @@
 """
 分页工具
+
+支持三种分页方式：
+- 偏移分页：offset(skip).limit(limit)，兼容原有的 skip/limit 参数
+- 游标分页：按 (排序键, ID) 做键集查询，翻页深度不影响查询耗时，游标为不透明的令牌
+- 不统计总数：跳过 COUNT 查询，适合只需要“下一页”的场景
+
+总数的统计方式由 COUNT_STRATEGY 配置，见 app.services.row_counter
 """
-from typing import Generic, List, TypeVar
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
 from pydantic import BaseModel
 from math import ceil
+from sqlalchemy import Select, and_, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.services.row_counter import count_statement, row_counter
 
 T = TypeVar('T')
 
@@ -44,3 +60,194 @@ class PaginatedResponse(BaseModel, Generic[T]):
             size=size,
             pages=pages
         )
+
+
+class InvalidCursorError(ValueError):
+    """游标令牌无法解析"""
+
+
+class PageParams(BaseModel):
+    """
+    列表分页参数
+
+    提供 cursor 时使用游标分页并忽略 skip，否则使用偏移分页
+    """
+    skip: int = 0
+    limit: int = 20
+    cursor: Optional[str] = None
+    with_total: bool = True
+
+
+class Page(Generic[T]):
+    """一页查询结果"""
+
+    def __init__(
+        self,
+        items: List[T],
+        total: Optional[int],
+        next_cursor: Optional[str],
+        total_exact: bool = True
+    ):
+        """
+        Args:
+            items: 当前页数据
+            total: 总数，不统计总数时为 None
+            next_cursor: 下一页游标，没有下一页时为 None
+            total_exact: 总数是否精确，为估算值或缓存值时为 False
+        """
+        self.items = items
+        self.total = total
+        self.next_cursor = next_cursor
+        self.total_exact = total_exact
+
+
+def encode_cursor(values: Tuple[Any, ...]) -> str:
+    """将 (排序键, ID) 编码为游标令牌"""
+    data = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Tuple[ColumnElement, ...]) -> Tuple[Any, ...]:
+    """解析游标令牌，并按列类型还原取值"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if not isinstance(data, list) or len(data) != len(columns):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    values = []
+    for column, value in zip(columns, data):
+        python_type = column.type.python_type
+        try:
+            if value is None or isinstance(value, python_type):
+                values.append(value)
+            elif python_type in (datetime, date):
+                values.append(python_type.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+        except (ValueError, TypeError):
+            raise InvalidCursorError("Invalid pagination cursor")
+    return tuple(values)
+
+
+class Paginator:
+    """
+    分页查询构建器
+
+    键集条件展开为 sort > v OR (sort = v AND id > id_v)，不依赖行值比较，各数据库都能使用
+    (sort, id) 上的索引。
+
+    window 统计方式下偏移分页的总数由分页查询中的 count(*) over () 一并返回；
+    游标分页的查询带有键集条件，窗口计数只是剩余行数，因此仍单独统计
+    """
+
+    def __init__(
+        self,
+        statement: Select,
+        params: PageParams,
+        *,
+        id_column: ColumnElement,
+        sort_column: Optional[ColumnElement] = None,
+        descending: bool = False
+    ):
+        """
+        Args:
+            statement: 不含分页的查询语句
+            params: 分页参数
+            id_column: 唯一键，排序键相同时用于确定顺序
+            sort_column: 排序键，默认为 ID
+            descending: 是否倒序
+        """
+        self.statement = statement
+        self.params = params
+        self.id_column = id_column
+        self.sort_column = sort_column if sort_column is not None else id_column
+        self.descending = descending
+
+    @property
+    def key_columns(self) -> Tuple[ColumnElement, ...]:
+        if self.sort_column is self.id_column:
+            return (self.id_column,)
+        return (self.sort_column, self.id_column)
+
+    @property
+    def window(self) -> bool:
+        """总数是否由分页查询中的窗口函数一并返回"""
+        return self.params.with_total and row_counter.window and not self.params.cursor
+
+    def count(self, db: Session) -> Tuple[Optional[int], bool]:
+        """单独统计总数，返回 (总数, 是否精确)，不统计总数时为 (None, False)"""
+        if not self.params.with_total:
+            return None, False
+        return row_counter.count(db, self.statement)
+
+    def split_rows(self, rows: List[Any]) -> Tuple[List[Any], Optional[int]]:
+        """拆分窗口统计的查询结果，返回 (数据, 总数)；当前页为空且不是第一页时总数未知"""
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        return [], (None if self.params.skip else 0)
+
+    def page_statement(self) -> Select:
+        """当前页的查询语句，多取一行用于判断是否有下一页"""
+        columns = self.key_columns
+        order = [column.desc() if self.descending else column.asc() for column in columns]
+        statement = self.statement.order_by(None).order_by(*order)
+        if self.window:
+            statement = statement.add_columns(func.count().over().label("total"))
+
+        if self.params.cursor:
+            values = decode_cursor(self.params.cursor, columns)
+            statement = statement.where(self._after(columns, values))
+        elif self.params.skip:
+            statement = statement.offset(self.params.skip)
+        return statement.limit(self.params.limit + 1)
+
+    def build_page(self, items: List[Any], total: Optional[int], total_exact: bool = True) -> Page:
+        """根据多取一行的查询结果生成分页结果"""
+        next_cursor = None
+        if len(items) > self.params.limit:
+            items = items[:self.params.limit]
+            last = items[-1]
+            next_cursor = encode_cursor(tuple(getattr(last, column.key) for column in self.key_columns))
+        return Page(items=items, total=total, next_cursor=next_cursor, total_exact=total_exact)
+
+    def _after(self, columns: Tuple[ColumnElement, ...], values: Tuple[Any, ...]) -> ColumnElement:
+        def beyond(column: ColumnElement, value: Any) -> ColumnElement:
+            return column < value if self.descending else column > value
+
+        if len(columns) == 1:
+            return beyond(columns[0], values[0])
+        (sort_column, id_column), (sort_value, id_value) = columns, values
+        return or_(
+            beyond(sort_column, sort_value),
+            and_(sort_column == sort_value, beyond(id_column, id_value))
+        )
+
+
+def paginate(db: Session, paginator: Paginator) -> Page:
+    """执行分页查询"""
+    if paginator.window:
+        items, total = paginator.split_rows(db.execute(paginator.page_statement()).all())
+        if total is None:
+            total = db.scalar(count_statement(paginator.statement))
+        return paginator.build_page(items, total)
+
+    total, total_exact = paginator.count(db)
+    items = db.scalars(paginator.page_statement()).all()
+    return paginator.build_page(items, total, total_exact)
+
+
+async def paginate_async(db: AsyncSession, paginator: Paginator) -> Page:
+    """执行分页查询（异步）"""
+    if paginator.window:
+        items, total = paginator.split_rows((await db.execute(paginator.page_statement())).all())
+        if total is None:
+            total = await db.scalar(count_statement(paginator.statement))
+        return paginator.build_page(items, total)
+
+    total, total_exact = await db.run_sync(paginator.count)
+    items = (await db.scalars(paginator.page_statement())).all()
+    return paginator.build_page(items, total, total_exact)
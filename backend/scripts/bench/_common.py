@@ -0,0 +1,47 @@
+"""
+基准测试脚本的公共设置
+
+配置在导入 app 时读取，脚本需先调用 setup_environment() 再导入 app 中的模块。
+每个脚本使用独立的 SQLite 数据库文件，运行前删除旧文件
+"""
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def default_database(name: str) -> str:
+    """脚本默认使用的数据库文件（位于临时目录）"""
+    return os.path.join(tempfile.gettempdir(), f"fastapi_admin_bench_{name}.db")
+
+
+def setup_environment(database: str, **settings: Any) -> None:
+    """
+    设置数据库和配置项，并把 backend 目录加入导入路径
+
+    Args:
+        database: SQLite 数据库文件路径，已存在时删除
+        settings: 覆盖的配置项，如 SQLITE_PROFILE="default"
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(database)}"
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("SQL_PROFILING_ENABLED", "false")
+    for key, value in settings.items():
+        os.environ[key] = str(value)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def per_call(fn: Callable[[], Any], number: int) -> float:
+    """预热一次后执行 number 次，返回平均耗时(秒)"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number
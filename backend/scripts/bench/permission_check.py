@@ -0,0 +1,62 @@
+"""
+权限检查微基准：遍历角色和权限集合 vs 权限位图
+
+300 个权限、30 个角色（每个角色 10 个权限），用户拥有其中 5 个角色。
+旧实现遍历已加载的 user.roles / role.permissions 收集权限代码（集合已预先加载，不产生 SQL），
+新实现对用户的权限位掩码做一次按位与（缓存已预热，不产生 SQL）
+
+参考结果: 遍历 25.0 us/次，位图 0.6 us/次
+
+运行: cd backend && python scripts/bench/permission_check.py
+"""
+import argparse
+
+from _common import default_database, per_call, setup_environment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", default=default_database("permission_check"))
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    setup_environment(args.database)
+
+    from app.core.database import SessionLocal
+    from app.core.schema import create_all_for_development
+    from app.models import Permission, Role, User
+    from app.services.permission_cache import permission_cache
+
+    create_all_for_development()
+    db = SessionLocal()
+    permissions = [
+        Permission(name=f"p{i}", code=f"res{i}:act", resource=f"res{i}", action="act") for i in range(300)
+    ]
+    roles = [Role(name=f"r{j}", permissions=permissions[j * 10:(j + 1) * 10]) for j in range(30)]
+    user = User(username="bench", email="bench@example.com", hashed_password="x", roles=roles[:5])
+    db.add(user)
+    db.commit()
+
+    code = "res45:act"
+    # 预先加载集合，旧实现只计遍历开销
+    _ = [permission.code for role in user.roles for permission in role.permissions]
+
+    def nested_loop() -> bool:
+        user_permissions = []
+        for role in user.roles:
+            for permission in role.permissions:
+                user_permissions.append(permission.code)
+        return code in user_permissions
+
+    principal = permission_cache.get_principal(db, user.id)
+
+    def bitset() -> bool:
+        return permission_cache.has_permission(db, principal, code)
+
+    assert nested_loop() and bitset()
+    print(f"nested loop: {per_call(nested_loop, args.number) * 1e6:.2f} us/check")
+    print(f"bitset:      {per_call(bitset, args.number) * 1e6:.2f} us/check")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+令牌验证微基准：每次 jwt.decode vs 已验证令牌缓存
+
+对同一个 HS256 令牌重复调用 verify_token，先禁用缓存（max_size=0，每次都解码并校验签名），
+再启用缓存（除第一次外都命中）。不访问数据库
+
+参考结果: 不缓存 53.5 us/次，缓存 2.4 us/次
+
+运行: cd backend && python scripts/bench/token_cache.py
+"""
+import argparse
+
+from _common import default_database, per_call, setup_environment
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    setup_environment(default_database("token_cache"))
+
+    from app.core.security import create_access_token, token_cache, verify_token
+
+    token = create_access_token(1)
+    max_size = token_cache.max_size or 10000
+
+    token_cache.max_size = 0
+    token_cache.clear()
+    uncached = per_call(lambda: verify_token(token), args.number)
+
+    token_cache.max_size = max_size
+    token_cache.hits = token_cache.misses = 0
+    cached = per_call(lambda: verify_token(token), args.number)
+
+    assert verify_token(token) == "1"
+    print(f"uncached: {uncached * 1e6:.2f} us/call")
+    print(f"cached:   {cached * 1e6:.2f} us/call  ({token_cache.stats()['hit_rate']:.2%} hits)")
+
+
+if __name__ == "__main__":
+    main()
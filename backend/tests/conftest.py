@@ -0,0 +1,80 @@
+"""
+测试公共设置
+
+所有测试共用一个临时 SQLite 数据库，环境变量需在导入 app 之前设置
+"""
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ.setdefault("DEBUG", "false")
+
+from typing import Dict, Sequence  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.schema import create_all_for_development  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Permission, Role, User  # noqa: E402
+from app.services.permission_cache import permission_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database() -> None:
+    """按模型建表并标记为最新迁移版本"""
+    create_all_for_development()
+
+
+@pytest.fixture
+def client(database) -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def statements():
+    """记录测试期间所有引擎执行的 SQL"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def make_user(username: str, permission_codes: Sequence[str]) -> Dict[str, str]:
+    """
+    创建拥有指定权限的用户，返回认证请求头
+
+    不存在的权限会被创建，每个用户使用一个同名角色。直接写入数据库不经过 CRUD 的缓存失效，
+    因此写入后清空权限缓存
+    """
+    db = SessionLocal()
+    try:
+        existing = {p.code: p for p in db.scalars(select(Permission).where(Permission.code.in_(permission_codes)))}
+        permissions = [
+            existing.get(code) or Permission(
+                name=code, code=code, resource=code.split(":")[0], action=code.split(":")[1]
+            )
+            for code in permission_codes
+        ]
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password="x",
+            roles=[Role(name=f"{username}_role", permissions=permissions)],
+        )
+        db.add(user)
+        db.commit()
+        token = create_access_token(user.id)
+    finally:
+        db.close()
+    permission_cache.clear()
+    return {"Authorization": f"Bearer {token}"}
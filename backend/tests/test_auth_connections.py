@@ -0,0 +1,34 @@
+"""
+鉴权查询的连接占用
+
+认证主体缓存未命中时鉴权需要查询数据库，查询使用的连接应在进入接口之前归还，
+否则每个并发请求持有一个连接再申请第二个，连接池耗尽时请求会互相等待
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import require_permission
+from app.core.database import AsyncSessionLocal, engine
+from app.services.permission_cache import Principal, permission_cache
+
+from conftest import make_user
+
+probe = FastAPI()
+
+
+@probe.get("/probe")
+async def checked_out_connections(
+    current_user: Principal = Depends(require_permission("system:config_read")),
+):
+    pool = (AsyncSessionLocal.engine or engine).pool
+    return {"checked_out": pool.checkedout()}
+
+
+def test_cold_permission_check_releases_its_connection(database):
+    headers = make_user("pooled", ["system:config_read"])
+    permission_cache.clear()
+
+    response = TestClient(probe).get("/probe", headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"checked_out": 0}
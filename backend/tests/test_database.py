@@ -0,0 +1,43 @@
+"""
+异步会话工厂
+
+没有可用的异步驱动时退回到在线程池中执行同步会话
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import AsyncDatabase, SessionLocal, ThreadedAsyncSession
+from app.crud.user import user as crud_user
+from app.models import User
+from app.utils.pagination import PageParams
+
+from conftest import make_user
+
+
+def test_unknown_backend_falls_back_to_threaded_session(database):
+    make_user("threaded", [])
+    factory = AsyncDatabase("oracle://scott@localhost/orcl", None, SessionLocal)
+
+    async def query():
+        async with factory() as db:
+            assert isinstance(db, ThreadedAsyncSession)
+            username = (await db.scalars(select(User.username).where(User.username == "threaded"))).first()
+            page = await crud_user.get_multi_with_search_async(db, page=PageParams(limit=5), keyword="threaded")
+            return username, page
+
+    username, page = asyncio.run(query())
+
+    assert factory.engine is None
+    assert username == "threaded"
+    assert [item.username for item in page.items] == ["threaded"]
+
+
+def test_missing_async_driver_falls_back_to_threaded_session(monkeypatch):
+    monkeypatch.setattr("app.core.database.async_driver_available", lambda async_url: False)
+    factory = AsyncDatabase("sqlite:///unused.db", None, SessionLocal)
+
+    session = factory()
+
+    assert isinstance(session, ThreadedAsyncSession)
+    asyncio.run(session.close())
@@ -0,0 +1,38 @@
+"""
+登录统计写回
+
+记录登录只写入内存缓冲，由写回任务或显式的 flush() 写入数据库
+"""
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models import User
+from app.services.login_stats import LoginStatsRecorder
+
+from conftest import make_user
+
+
+def login_count(username: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(User.login_count).where(User.username == username))
+    finally:
+        db.close()
+
+
+def test_record_buffers_until_flush(database):
+    make_user("buffered", [])
+    db = SessionLocal()
+    user_id = db.scalar(select(User.id).where(User.username == "buffered"))
+    db.close()
+    recorder = LoginStatsRecorder()
+
+    recorder.record(user_id, ip_address="127.0.0.1")
+    recorder.record(user_id, ip_address="127.0.0.2")
+
+    assert recorder.pending_count(user_id) == 2
+    assert login_count("buffered") == 0
+
+    assert recorder.flush() == 1
+    assert recorder.pending_count(user_id) == 0
+    assert login_count("buffered") == 2
@@ -0,0 +1,42 @@
+"""
+认证请求的 SQL 语句数
+
+受权限保护、本身不访问数据库的接口：
+- 缓存为空时 3 条（一条加载用户和角色，两条构建权限位图索引）
+- 缓存命中时 0 条
+
+运行: cd backend && python -m pytest -q tests
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.permission_cache import permission_cache
+
+from conftest import make_user
+
+GUARDED_URL = f"{settings.API_V1_STR}/monitoring/token-cache"
+
+
+@pytest.fixture(scope="module")
+def auth_headers(database):
+    return make_user("principal", ["system:config_read"])
+
+
+def test_cold_cache_loads_principal_in_three_statements(client, auth_headers, statements):
+    permission_cache.clear()
+
+    response = client.get(GUARDED_URL, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == 3, statements
+
+
+def test_warm_cache_issues_no_statements(client, auth_headers, statements):
+    assert client.get(GUARDED_URL, headers=auth_headers).status_code == 200
+    statements.clear()
+
+    for _ in range(3):
+        response = client.get(GUARDED_URL, headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+    assert statements == []
@@ -0,0 +1,40 @@
+"""
+列表查询和存在性检查的执行计划
+
+在迁移后的 SQLite 数据库上执行 app.core.query_plans 的 EXPLAIN 检查，任一查询出现全表扫描（SCAN <table>）即失败。
+数据库先初始化到最新版本，再降级到添加列表索引之前并重新升级，索引和全文索引均由迁移创建
+"""
+import pytest
+from alembic import command
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.core.query_plans import check_query_plans, guard_query_statements, list_query_statements
+from app.core.schema import alembic_config, upgrade_schema
+
+# 添加列表查询索引（a51c3e9d7b20）之前的版本
+BEFORE_INDEXES = "3f9a1c7d2e64"
+
+STATEMENT_NAMES = [*list_query_statements(), *guard_query_statements()]
+
+
+@pytest.fixture(scope="module")
+def query_plans(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "DATABASE_URL", url)
+        bind = create_engine(url)
+        upgrade_schema(bind)
+        command.downgrade(alembic_config(), BEFORE_INDEXES)
+        command.upgrade(alembic_config(), "head")
+        results = {name: (plan, scanned) for name, plan, scanned in check_query_plans(bind)}
+        bind.dispose()
+    return results
+
+
+@pytest.mark.parametrize("name", STATEMENT_NAMES)
+def test_query_does_not_scan_table(query_plans, name):
+    plan, scanned = query_plans[name]
+
+    assert plan
+    assert scanned == [], "\n".join(plan)
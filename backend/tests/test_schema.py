@@ -0,0 +1,37 @@
+"""
+数据库结构版本管理
+"""
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from app.core.config import settings
+from app.core.schema import (
+    SchemaVersionError,
+    check_schema,
+    get_database_revision,
+    get_packaged_head,
+    upgrade_schema,
+)
+
+
+@pytest.fixture
+def empty_engine(tmp_path, monkeypatch):
+    """指向空 SQLite 数据库的引擎（Alembic 命令同样使用该数据库）"""
+    url = f"sqlite:///{tmp_path / 'empty.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    bind = create_engine(url)
+    yield bind
+    bind.dispose()
+
+
+def test_check_reports_uninitialized_database(empty_engine):
+    with pytest.raises(SchemaVersionError, match="python -m app.core.schema upgrade"):
+        check_schema(empty_engine)
+
+
+def test_upgrade_initializes_empty_database(empty_engine):
+    upgrade_schema(empty_engine)
+
+    assert get_database_revision(empty_engine) == get_packaged_head()
+    assert {"user", "role", "permission", "system_configs"} <= set(inspect(empty_engine).get_table_names())
+    check_schema(empty_engine)
@@ -0,0 +1,168 @@
+"""
+访问令牌中的鉴权声明（ACCESS_TOKEN_EMBED_CLAIMS）
+
+版本号匹配时不加载用户，权限由声明中的角色和位图索引计算；
+用户、角色或权限变化后版本号失效，回退到数据库路径
+"""
+import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.crud.role import role as crud_role
+from app.crud.user import user as crud_user
+from app.models import Permission, User
+from app.services.permission_cache import permission_cache
+
+from conftest import make_user
+
+GUARDED_URL = f"{settings.API_V1_STR}/monitoring/token-cache"
+LOGIN_URL = f"{settings.API_V1_STR}/auth/login"
+
+
+@pytest.fixture
+def claims_mode(monkeypatch):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EMBED_CLAIMS", True)
+
+
+@pytest.fixture
+def principal_loads(monkeypatch):
+    """记录走数据库路径加载认证主体的用户"""
+    loaded = []
+    get_principal = permission_cache.get_principal
+
+    def record(db, user_id):
+        loaded.append(user_id)
+        return get_principal(db, user_id)
+
+    monkeypatch.setattr(permission_cache, "get_principal", record)
+    return loaded
+
+
+def login(client, username: str) -> dict:
+    make_user(username, ["system:config_read"])
+    db = SessionLocal()
+    try:
+        db.execute(
+            User.__table__.update()
+            .where(User.username == username)
+            .values(hashed_password=get_password_hash("secret"))
+        )
+        db.commit()
+    finally:
+        db.close()
+    response = client.post(LOGIN_URL, json={"username": username, "password": "secret"})
+    assert response.status_code == 200, response.text
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def claims(headers: dict) -> dict:
+    token = headers["Authorization"].split()[1]
+    return jwt.get_unverified_claims(token)
+
+
+def with_session(fn):
+    db = SessionLocal()
+    try:
+        result = fn(db)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def test_login_embeds_claims_only_when_enabled(client):
+    headers = login(client, "plain_login")
+
+    assert "pv" not in claims(headers)
+
+
+def test_login_embeds_claims(client, claims_mode):
+    headers = login(client, "claims_login")
+    token = claims(headers)
+
+    assert token["name"] == "claims_login"
+    assert token["act"] is True
+    assert len(token["rls"]) == 1
+    assert token["pv"]
+
+
+def test_matching_claims_skip_user_lookup(client, claims_mode, principal_loads, statements):
+    headers = login(client, "claims_fast")
+    assert client.get(GUARDED_URL, headers=headers).status_code == 200
+    principal_loads.clear()
+    statements.clear()
+
+    for _ in range(3):
+        response = client.get(GUARDED_URL, headers=headers)
+        assert response.status_code == 200, response.text
+
+    assert principal_loads == []
+    assert statements == []
+
+
+def test_role_permission_change_falls_back_to_database(client, claims_mode, principal_loads):
+    headers = login(client, "claims_revoked")
+    role_id = claims(headers)["rls"][0]
+    permission_id = with_session(lambda db: db.scalar(
+        select(Permission.id).where(Permission.code == "system:config_read")
+    ))
+
+    with_session(lambda db: crud_role.remove_permission(db, role_id=role_id, permission_id=permission_id))
+    response = client.get(GUARDED_URL, headers=headers)
+
+    assert response.status_code == 403
+    assert principal_loads != []
+
+
+def test_role_removal_falls_back_to_database(client, claims_mode, principal_loads):
+    headers = login(client, "claims_unassigned")
+
+    def remove_roles(db):
+        user = db.scalar(select(User).where(User.username == "claims_unassigned"))
+        crud_user.update(db, db_obj=user, obj_in={"role_ids": []})
+
+    with_session(remove_roles)
+    response = client.get(GUARDED_URL, headers=headers)
+
+    assert response.status_code == 403
+    assert principal_loads != []
+
+
+def test_deactivated_user_is_rejected(client, claims_mode):
+    headers = login(client, "claims_inactive")
+
+    def deactivate(db):
+        user = db.scalar(select(User).where(User.username == "claims_inactive"))
+        crud_user.update(db, db_obj=user, obj_in={"is_active": False})
+
+    with_session(deactivate)
+
+    assert client.get(GUARDED_URL, headers=headers).status_code == 400
+
+
+def test_claims_from_another_process_are_not_trusted(client, claims_mode, principal_loads):
+    headers = login(client, "claims_foreign")
+    user_id = int(claims(headers)["sub"])
+    role_ids = claims(headers)["rls"]
+
+    assert permission_cache.principal_from_claims(user_id, "claims_foreign", True, role_ids, "other.1") is None
+    assert permission_cache.principal_from_claims(
+        user_id, "claims_foreign", True, role_ids, claims(headers)["pv"]
+    ) is not None
+
+
+def test_claims_permissions_come_from_role_masks(client, claims_mode):
+    headers = login(client, "claims_mask")
+    token = claims(headers)
+
+    principal = permission_cache.principal_from_claims(
+        int(token["sub"]), token["name"], True, token["rls"], token["pv"]
+    )
+
+    assert principal.has_permission("system:config_read")
+    assert not principal.has_permission("user:delete")
+    assert principal.role_ids == tuple(token["rls"])
@@ -0,0 +1,82 @@
+"""
+创建用户
+
+用户名、邮箱重复由唯一约束检出；SQLAlchemy 警告视为错误
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import verify_password
+from app.crud.user import user as crud_user
+from app.models import Role, User
+
+from conftest import make_user
+
+pytestmark = pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+
+USERS_URL = f"{settings.API_V1_STR}/users/"
+
+
+@pytest.fixture(scope="module")
+def auth_headers(database):
+    return make_user("creator", ["user:create", "user:read", "user:update"])
+
+
+def test_create_user_with_roles(client, auth_headers):
+    db = SessionLocal()
+    role_ids = list(db.scalars(select(Role.id).where(Role.name == "creator_role")))
+    db.close()
+
+    response = client.post(USERS_URL, headers=auth_headers, json={
+        "username": "alice", "email": "alice@example.com", "password": "secret123", "role_ids": role_ids,
+    })
+
+    assert response.status_code == 200, response.text
+    assert [role["id"] for role in response.json()["roles"]] == role_ids
+
+
+@pytest.mark.parametrize("payload, detail_field", [
+    ({"username": "bob", "email": "bob2@example.com"}, "username"),
+    ({"username": "bob2", "email": "bob@example.com"}, "email"),
+])
+def test_duplicate_user_is_rejected(client, auth_headers, payload, detail_field):
+    response = client.post(USERS_URL, headers=auth_headers, json={
+        "username": "bob", "email": "bob@example.com", "password": "secret123",
+    })
+    assert response.status_code in (200, 400), response.text
+
+    response = client.post(USERS_URL, headers=auth_headers, json={**payload, "password": "secret123"})
+
+    assert response.status_code == 400, response.text
+
+
+def test_update_user_password(client, auth_headers):
+    response = client.post(USERS_URL, headers=auth_headers, json={
+        "username": "carol", "email": "carol@example.com", "password": "secret123",
+    })
+    user_id = response.json()["id"]
+
+    response = client.put(f"{USERS_URL}{user_id}", headers=auth_headers, json={"password": "changed456"})
+
+    assert response.status_code == 200, response.text
+    db = SessionLocal()
+    hashed_password = db.scalar(select(User.hashed_password).where(User.id == user_id))
+    db.close()
+    assert verify_password("changed456", hashed_password)
+
+
+@pytest.mark.parametrize("message, column", [
+    ("UNIQUE constraint failed: user.email", "email"),
+    ('duplicate key value violates unique constraint "ix_user_username"\n'
+     "DETAIL:  Key (username)=(bob) already exists.", "username"),
+    ("(1062, \"Duplicate entry 'bob' for key 'user.ix_user_username'\")", "username"),
+    ("(1062, \"Duplicate entry 'bob@example.com' for key 'ix_user_email'\")", "email"),
+    ("(1062, \"Duplicate entry 'bob' for key 'other_key'\")", None),
+])
+def test_unique_violation_recognises_dialect_messages(message, column):
+    error = IntegrityError("INSERT INTO user ...", {}, Exception(message))
+
+    assert crud_user.unique_violation(error) == column